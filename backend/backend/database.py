@@ -0,0 +1,62 @@
+"""
+Environment-driven DATABASES["default"].
+
+DB_ENGINE=sqlite (default) keeps db.sqlite3, tuned for concurrent writers unless
+SQLITE_TUNED=0. WAL is only switched on for a database named by DB_NAME (or with
+SQLITE_WAL=1): journal_mode is written into the file itself, and the checked-in dev
+database must not change just because a management command connected to it.
+DB_ENGINE=postgresql reads DB_NAME/DB_USER/DB_PASSWORD/DB_HOST/DB_PORT
+and keeps connections open for DB_CONN_MAX_AGE seconds, checking them before reuse.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_PRAGMAS = {
+    "busy_timeout": 20000,  # ms to wait for a lock before "database is locked"
+    "mmap_size": 128 * 1024 * 1024,  # read pages through the OS page cache
+}
+# persistent: set once, these rewrite the database file's header
+SQLITE_WAL_PRAGMAS = {
+    "journal_mode": "WAL",  # readers no longer block the writer, nor the writer readers
+    "synchronous": "NORMAL",  # with WAL, fsync only at checkpoints; still crash-safe
+}
+
+
+def sqlite_options(tuned=True, wal=True):
+    if not tuned:
+        return {}
+    pragmas = {**SQLITE_WAL_PRAGMAS, **SQLITE_PRAGMAS} if wal else SQLITE_PRAGMAS
+    return {
+        # runs on every new connection, like a connection_created receiver would
+        "init_command": ";".join(f"PRAGMA {name}={value}" for name, value in pragmas.items()),
+        # atomic() takes the write lock at BEGIN, where busy_timeout can wait for it,
+        # instead of failing immediately when a read transaction tries to upgrade
+        "transaction_mode": "IMMEDIATE",
+    }
+
+
+def database_config(base_dir, environ=os.environ):
+    engine = environ.get("DB_ENGINE", "sqlite").lower()
+    if engine in ("postgres", "postgresql"):
+        return {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": environ.get("DB_NAME", "worklane"),
+            "USER": environ.get("DB_USER", ""),
+            "PASSWORD": environ.get("DB_PASSWORD", ""),
+            "HOST": environ.get("DB_HOST", "localhost"),
+            "PORT": environ.get("DB_PORT", "5432"),
+            "CONN_MAX_AGE": int(environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+            "OPTIONS": {"connect_timeout": int(environ.get("DB_CONNECT_TIMEOUT", 5))},
+        }
+    if engine != "sqlite":
+        raise ImproperlyConfigured(f"Unsupported DB_ENGINE {engine!r}; use sqlite or postgresql.")
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": environ.get("DB_NAME") or base_dir / "db.sqlite3",
+        "OPTIONS": sqlite_options(
+            tuned=environ.get("SQLITE_TUNED", "1") == "1",
+            wal=environ.get("SQLITE_WAL", "1" if environ.get("DB_NAME") else "0") == "1",
+        ),
+    }
@@ -0,0 +1,103 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset pagination over (created_at, id).
+
+    Only kicks in when the request carries ?cursor= or ?limit=, so existing
+    clients keep receiving a plain list. Each page seeks past the last row of
+    the previous one instead of using OFFSET, so page K costs the same as page 1.
+    """
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = 50
+    max_limit = 200
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, descending=False):
+        self.descending = descending
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.limit_query_param not in params:
+            return None
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.field = queryset.model._meta.get_field("created_at")
+        self.nulls_last = self.nulls_sort_last(queryset.db)
+
+        prefix = "-" if self.descending else ""
+        queryset = queryset.order_by(f"{prefix}created_at", f"{prefix}id")
+
+        position = self.decode_cursor(params.get(self.cursor_query_param))
+        if position is not None:
+            queryset = queryset.filter(self.after(*position))
+
+        page = list(queryset[:self.limit + 1])
+        self.has_next = len(page) > self.limit
+        page = page[:self.limit]
+        self.next_position = (page[-1].created_at, page[-1].pk) if self.has_next else None
+        return page
+
+    def get_paginated_response(self, data):
+        next_cursor = self.encode_cursor(*self.next_position) if self.has_next else None
+        next_link = None
+        if next_cursor:
+            next_link = replace_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param, next_cursor
+            )
+        return Response({"next": next_link, "next_cursor": next_cursor, "results": data})
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, self.default_limit))
+        except (TypeError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def nulls_sort_last(self, alias):
+        # NULL created_at rows sort wherever the backend puts them by default, so the
+        # (user, created_at, id) index can still serve the ORDER BY
+        nulls_largest = connections[alias].features.nulls_order_largest
+        return nulls_largest != self.descending
+
+    def after(self, created_at, pk):
+        op = "lt" if self.descending else "gt"
+        if created_at is None:
+            condition = Q(created_at__isnull=True, **{f"id__{op}": pk})
+            if not self.nulls_last:
+                condition |= Q(created_at__isnull=False)
+            return condition
+
+        condition = Q(**{f"created_at__{op}": created_at}) | Q(created_at=created_at, **{f"id__{op}": pk})
+        if self.nulls_last:
+            condition |= Q(created_at__isnull=True)
+        return condition
+
+    def encode_cursor(self, created_at, pk):
+        value = created_at.isoformat() if created_at is not None else None
+        raw = json.dumps([value, pk], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            created_at = self.field.to_python(value) if value is not None else None
+            return created_at, int(pk)
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
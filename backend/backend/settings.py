@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta #
 
+from .database import database_config
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60), #  
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),    #  
@@ -92,11 +94,9 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Picked from the environment (DB_ENGINE etc.); see backend/database.py
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR),
 }
 
 
@@ -145,7 +145,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 ##
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user_auth.authentication.CachedJWTAuthentication',
     ),
 }
 
@@ -166,4 +166,103 @@ CLOUDINARY = {
     "cloud_name": os.getenv("CLOUDINARY_CLOUD_NAME"),
     "api_key": os.getenv("CLOUDINARY_API_KEY"),
     "api_secret": os.getenv("CLOUDINARY_API_SECRET"),
-}
\ No newline at end of file
+}
+
+# Bulk employee import: rows are validated and inserted CHUNK_SIZE at a time
+EMPLOYEE_IMPORT = {
+    "CHUNK_SIZE": 500,
+    "MAX_ROWS": 10000,
+}
+
+# Facebook/Instagram Graph API used for social publishing
+SOCIAL_GRAPH = {
+    "URL": os.getenv("GRAPH_API_URL", "https://graph.facebook.com/v17.0"),
+    "CONNECT_TIMEOUT": 5,  # seconds
+    "TIMEOUT": float(os.getenv("GRAPH_API_TIMEOUT", 30)),  # seconds per call
+    "POOL_SIZE": 10,  # keep-alive connections shared by publishing threads
+}
+# Scheduled posts (marketing.dispatcher), run by the scheduler process
+SOCIAL_DISPATCH = {
+    "INTERVAL": 30,  # seconds between dispatches
+    "BATCH_SIZE": 200,  # due posts claimed per dispatch
+    "WORKERS": int(os.getenv("SOCIAL_DISPATCH_WORKERS", 8)),  # accounts published in parallel
+    "RATE_PER_HOUR": 200,  # Graph calls per access token
+    "BURST": 10,
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF": 60,  # seconds; doubles per attempt, with jitter
+    "MAX_BACKOFF": 60 * 60,
+    "STALE_AFTER": 10 * 60,  # seconds before an unfinished claim is retried
+}
+
+# Poster generation
+# POSTER_BACKEND names a marketing.backends.PosterBackend subclass; jobs run on an in-process pool
+POSTER_BACKEND = "marketing.backends.GradioBackend"
+POSTER_GRADIO = {
+    "SPACE_ID": "Parth2005147/Pollinations-Image-Generator",
+    "POOL_SIZE": int(os.getenv("POSTER_GRADIO_POOL_SIZE", 4)),
+    "CLIENT_MAX_AGE": 30 * 60,  # seconds before a client reconnects
+    "PING_AFTER": 60,  # seconds idle before a client is probed before reuse
+    "CHECKOUT_TIMEOUT": 120,  # seconds to wait for a free client before failing the job
+}
+POSTER_JOB_WORKERS = int(os.getenv("POSTER_JOB_WORKERS", 2))
+POSTER_JOBS_EAGER = False  # run poster jobs and uploads inline on commit (tests)
+POSTER_JOB_STALE_AFTER = 15 * 60  # seconds before the scheduler requeues a queued/running job
+# Background Cloudinary uploads of generated posters
+POSTER_UPLOAD = {
+    "WORKERS": int(os.getenv("POSTER_UPLOAD_WORKERS", 2)),
+    "RETRIES": 3,
+    "BACKOFF": 2.0,  # seconds; doubles per attempt, with jitter
+    "CHUNK_SIZE": 6 * 1024 * 1024,  # bytes per Cloudinary upload_large request
+    "STALE_AFTER": 5 * 60,  # seconds a poster may stay pending before it is queued again
+}
+# WebP derivatives built next to each stored render; SIZES bound the longest side in px
+POSTER_DERIVATIVES = {
+    "SIZES": {"thumbnail": 320, "medium": 1024},
+    "QUALITY": 80,
+}
+# Keep a copy of each render in MEDIA_ROOT; when off, renders go straight to Cloudinary
+POSTER_PERSIST_LOCAL = os.getenv("POSTER_PERSIST_LOCAL", "1") == "1"
+POSTER_BATCH_PARALLELISM = int(os.getenv("POSTER_BATCH_PARALLELISM", 4))  # renders in flight per batch
+POSTER_BATCH_MAX_VARIANTS = 10
+# A user's identical enhanced prompts (up to whitespace) reuse their earlier render
+# instead of generating again; renders are never shared between users
+POSTER_PROMPT_CACHE = {
+    "ENABLED": os.getenv("POSTER_PROMPT_CACHE", "1") == "1",
+    "MAX_ENTRIES": int(os.getenv("POSTER_PROMPT_CACHE_SIZE", 256)),
+    "TTL": int(os.getenv("POSTER_PROMPT_CACHE_TTL", 24 * 60 * 60)),  # seconds
+}
+
+# Cache
+# Dashboard payloads are invalidated by version bumps, so every web worker must share
+# one cache in production (set REDIS_URL); the local-memory fallback is per process.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", 300))
+# Seconds an authenticated user is reused across requests; saves invalidate it sooner
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 60))
+
+
+# Logging
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "projects": {"handlers": ["console"], "level": os.getenv("APP_LOG_LEVEL", "INFO")},
+        "marketing": {"handlers": ["console"], "level": os.getenv("APP_LOG_LEVEL", "INFO")},
+    },
+}
@@ -0,0 +1,27 @@
+"""
+Version stamps for cache invalidation. Cached values embed the current stamp of
+their namespace and id in their key; bumping the stamp orphans every one of them at
+once, and they simply expire.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(namespace, key):
+    return f"{namespace}:version:{key}"
+
+
+def get_version(namespace, key):
+    # seed with a timestamp so an evicted version key can never resurrect an old value
+    return cache.get_or_set(_version_key(namespace, key), lambda: time.time_ns(), None)
+
+
+def bump_version(namespace, key):
+    """Invalidate everything cached under this namespace and id."""
+    if key is None:
+        return
+    try:
+        cache.incr(_version_key(namespace, key))
+    except ValueError:
+        cache.set(_version_key(namespace, key), time.time_ns(), None)
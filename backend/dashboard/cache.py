@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from backend import versioning
+
+# How long a cached dashboard payload may live; writes bump the version long before that
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300)
+
+STATS_KEYS = {"hits": "dashboard:stats:hits", "misses": "dashboard:stats:misses"}
+
+
+def get_version(user_id):
+    return versioning.get_version("dashboard", user_id)
+
+
+def bump_version(user_id):
+    """Invalidate every cached dashboard payload for this user."""
+    versioning.bump_version("dashboard", user_id)
+
+
+def _payload_key(user_id, version):
+    return f"dashboard:data:{user_id}:v{version}"
+
+
+def _count(stat):
+    key = STATS_KEYS[stat]
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_payload(user_id):
+    version = get_version(user_id)
+    payload = cache.get(_payload_key(user_id, version))
+    _count("misses" if payload is None else "hits")
+    return version, payload
+
+
+def set_payload(user_id, version, payload):
+    cache.set(_payload_key(user_id, version), payload, DASHBOARD_CACHE_TIMEOUT)
+
+
+def get_stats():
+    values = cache.get_many(STATS_KEYS.values())
+    stats = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
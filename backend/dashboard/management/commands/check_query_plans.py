@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from dashboard.query_plans import explain, full_scans, hot_queries
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot tenant-scoped queries and fail if any of them falls back to a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every query plan.")
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, queryset in hot_queries().items():
+            plan = explain(queryset)
+            scans = full_scans(plan)
+            if options["verbose_plans"] or scans:
+                self.stdout.write(f"-- {label}\n{plan}")
+            if scans is None:
+                self.stdout.write(self.style.WARNING(f"{label}: cannot judge {connection.vendor} plans"))
+            elif scans:
+                failures.append(f"{label} scans {', '.join(scans)}")
+            else:
+                self.stdout.write(f"{label}: ok")
+
+        if failures:
+            raise CommandError("Full table scans found: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Every hot query uses an index."))
@@ -0,0 +1,54 @@
+import re
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from employees.models import Employee
+from marketing.models import Poster, ScheduledPost
+from projects.models import Project, Task
+
+# A placeholder owner: EXPLAIN only needs the shape of the query, not matching rows
+SAMPLE_ID = 1
+
+
+def hot_queries():
+    """The tenant-scoped queries behind the busiest endpoints, keyed by a label."""
+    return {
+        "dashboard deadlines": Project.objects.filter(user_id=SAMPLE_ID, deadline__isnull=False)
+        .order_by("deadline").only("name", "deadline")[:3],
+        "project list": Project.objects.filter(user_id=SAMPLE_ID).order_by("created_at", "id")[:50],
+        "pending tasks": Task.objects.filter(project_id=SAMPLE_ID, is_completed=False).only("id", "name"),
+        "poster list": Poster.objects.filter(user_id=SAMPLE_ID).order_by("-created_at", "-id")[:50],
+        "employee count": Employee.objects.filter(user_id=SAMPLE_ID).values("pk"),
+        "employee list": Employee.objects.filter(user_id=SAMPLE_ID).order_by("created_at", "id")[:50],
+        "due scheduled posts": ScheduledPost.objects.filter(
+            status=ScheduledPost.SCHEDULED, due_at__lte=timezone.now()
+        ).order_by("due_at", "id")[:200],
+    }
+
+
+# SQLite reports "SCAN <table>" for a table walk and "SEARCH"/"SCAN ... USING INDEX" otherwise
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)(?:\s|$)")
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def explain(queryset):
+    """EXPLAIN text for queryset; on PostgreSQL seq scans are disabled so only unindexable queries use one."""
+    if connection.vendor == "postgresql":
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+    return queryset.explain()
+
+
+def full_scans(plan, vendor=None):
+    """Tables the plan reads in full, or None when the backend's plans are not understood."""
+    vendor = vendor or connection.vendor
+    if vendor == "sqlite":
+        pattern = SQLITE_FULL_SCAN
+    elif vendor == "postgresql":
+        pattern = POSTGRES_FULL_SCAN
+    else:
+        return None
+    return sorted(set(pattern.findall(plan)))
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employees.models import Employee
+from marketing.models import Poster
+from projects.models import Project, Task
+
+from .cache import bump_version
+
+
+@receiver([post_save, post_delete], sender=Employee)
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Poster)
+def invalidate_owner_dashboard(sender, instance, **kwargs):
+    bump_version(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_dashboard(sender, instance, origin=None, **kwargs):
+    if origin is not None and origin is not instance:
+        # cascades and queryset deletes, like bulk_create/update, are left to the
+        # caller; skipping them also keeps those deletes from querying per row
+        return
+    if Task.project.is_cached(instance):
+        user_id = instance.project.user_id
+    else:
+        user_id = Project.objects.filter(pk=instance.project_id).values_list("user_id", flat=True).first()
+    bump_version(user_id)
@@ -1,3 +1,106 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from projects.models import Project, Task
+
+from .cache import get_stats
+from .query_plans import explain, full_scans
+
+
+class DashboardDataViewTests(TestCase):
+    url = "/api/dashboard/data/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def make_project(self, name, total, completed, days=30):
+        project = Project.objects.create(
+            user=self.user, name=name, deadline=date.today() + timedelta(days=days)
+        )
+        Task.objects.bulk_create(
+            Task(project=project, name=f"{name}-{i}", is_completed=i < completed) for i in range(total)
+        )
+        project.refresh_task_counters()
+        return project
+
+    def test_payload(self):
+        self.make_project("empty", 0, 0, days=-1)
+        self.make_project("pending", 2, 0, days=5)
+        self.make_project("ongoing", 2, 1, days=10)
+        self.make_project("done", 2, 2)
+        self.make_project("barely-started", 150, 1)  # progress truncates to 0
+        Employee.objects.create(user=self.user, name="Ana", email="ana@example.com",
+                                position="Dev", department="Eng")
+
+        data = self.client.get(self.url).data
+
+        self.assertEqual(data["counts"], {"employees": 1, "projects": 5, "tasks": 4, "posters": 0})
+        self.assertEqual([p["progress"] for p in data["projects"]], [0, 0, 50, 100, 0])
+        self.assertEqual([d["project"] for d in data["deadlines"]], ["empty", "pending", "ongoing"])
+        self.assertEqual(data["deadlines"][0]["status"], "overdue")
+        self.assertEqual(data["team"], [{"name": "Ana", "role": "Dev"}])
+        self.assertEqual(
+            {s["label"]: s["count"] for s in data["statusStats"]},
+            {"Ongoing": 1, "Completed": 1, "Pending": 3},
+        )
+
+    def test_query_count_is_independent_of_project_count(self):
+        self.make_project("first", 3, 1)
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+        for i in range(20):
+            self.make_project(f"p{i}", 3, i % 4)
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+    def test_repeat_loads_are_served_from_cache(self):
+        self.make_project("first", 2, 1)
+        self.assertEqual(self.client.get(self.url)["X-Dashboard-Cache"], "miss")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Dashboard-Cache"], "hit")
+        self.assertEqual(response.data["counts"]["projects"], 1)
+        self.assertEqual(get_stats()["hits"], 1)
+
+    def test_writes_invalidate_cached_payload(self):
+        project = self.make_project("first", 2, 1)
+        self.client.get(self.url)
+
+        task = project.tasks.get(is_completed=False)
+        task.is_completed = True
+        task.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Dashboard-Cache"], "miss")
+        self.assertEqual(response.data["counts"]["tasks"], 2)
+
+        Employee.objects.create(user=self.user, name="Ana", email="ana@example.com",
+                                position="Dev", department="Eng")
+        self.assertEqual(self.client.get(self.url).data["counts"]["employees"], 1)
+
+        project.delete()
+        self.assertEqual(self.client.get(self.url).data["counts"]["projects"], 0)
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertIn("Every hot query uses an index.", out.getvalue())
 
-# Create your tests here.
+    def test_detects_full_scans(self):
+        self.assertEqual(full_scans("2 0 0 SCAN employees_employee", "sqlite"), ["employees_employee"])
+        self.assertEqual(full_scans("3 0 0 SCAN marketing_poster USING INDEX poster_user_created_idx", "sqlite"), [])
+        self.assertEqual(full_scans("Seq Scan on projects_task  (cost=0.00..1.01)", "postgresql"), ["projects_task"])
+        self.assertEqual(full_scans(explain(Employee.objects.filter(bio="x"))), ["employees_employee"])
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import DashboardDataView
+from .views import DashboardCacheStatsView, DashboardDataView
 
 urlpatterns = [
     path('data/', DashboardDataView.as_view(), name='dashboard-data'),
+    path('cache-stats/', DashboardCacheStatsView.as_view(), name='dashboard-cache-stats'),
 ]
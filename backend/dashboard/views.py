@@ -1,24 +1,52 @@
 from datetime import date
+from django.db.models import Count, F, Q, Sum
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
 from employees.models import Employee
-from projects.models import Project, Task
+from projects.models import Project
 from marketing.models import Poster
 
+from . import cache as dashboard_cache
+
+# Progress buckets expressed on the stored task counters so they can be
+# aggregated in SQL. They mirror Project.progress, which truncates to an int.
+COMPLETED = Q(total_tasks__gt=0, completed_tasks=F("total_tasks"))
+PENDING = Q(total_tasks=0) | Q(total_tasks__gt=F("completed_tasks") * 100)
+ONGOING = ~COMPLETED & ~PENDING
+
 
 class DashboardDataView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
+        version, payload = dashboard_cache.get_payload(request.user.id)
+        cache_status = "hit"
+        if payload is None:
+            payload = self.build_payload(request.user)
+            dashboard_cache.set_payload(request.user.id, version, payload)
+            cache_status = "miss"
+
+        return Response(payload, headers={"X-Dashboard-Cache": cache_status})
+
+    def build_payload(self, user):
+        projects = Project.objects.filter(user=user)
+
+        # === PROJECT AGGREGATES (counts + status buckets in one query) ===
+        totals = projects.aggregate(
+            projects=Count("id"),
+            tasks=Sum("completed_tasks", default=0),
+            ongoing=Count("id", filter=ONGOING),
+            completed=Count("id", filter=COMPLETED),
+            pending=Count("id", filter=PENDING),
+        )
 
         # === COUNTS ===
         counts = {
             "employees": Employee.objects.filter(user=user).count(),
-            "projects": Project.objects.filter(user=user).count(),
-            "tasks": Task.objects.filter(project__user=user, is_completed=True).count(),
+            "projects": totals["projects"],
+            "tasks": totals["tasks"],
             "posters": Poster.objects.filter(user=user).count(),
         }
 
@@ -29,12 +57,13 @@ class DashboardDataView(APIView):
                 "deadline": p.deadline.strftime("%Y-%m-%d") if p.deadline else None,
                 "progress": p.progress,
             }
-            for p in Project.objects.filter(user=user)
+            for p in projects.only("name", "deadline", "total_tasks", "completed_tasks").order_by("id")
         ]
 
         # === DEADLINES ===
         deadlines_list = []
-        for p in Project.objects.filter(user=user, deadline__isnull=False).order_by("deadline")[:3]:
+        upcoming = projects.filter(deadline__isnull=False).order_by("deadline").only("name", "deadline")[:3]
+        for p in upcoming:
             due_date = p.deadline
             status = "overdue" if due_date < date.today() else "upcoming"
             deadlines_list.append({
@@ -45,31 +74,28 @@ class DashboardDataView(APIView):
 
         # === TEAM ===
         team_list = [
-            {"name": e.name, "role": e.position}
-            for e in Employee.objects.filter(user=user)[:3]
+            {"name": name, "role": position}
+            for name, position in Employee.objects.filter(user=user).values_list("name", "position")[:3]
         ]
 
         # === STATUS STATS ===
-        all_projects = Project.objects.filter(user=user)
         status_stats = [
-            {
-                "label": "Ongoing",
-                "count": sum(1 for p in all_projects if 0 < p.progress < 100),
-            },
-            {
-                "label": "Completed",
-                "count": sum(1 for p in all_projects if p.progress == 100),
-            },
-            {
-                "label": "Pending",
-                "count": sum(1 for p in all_projects if p.progress == 0),
-            },
+            {"label": "Ongoing", "count": totals["ongoing"]},
+            {"label": "Completed", "count": totals["completed"]},
+            {"label": "Pending", "count": totals["pending"]},
         ]
 
-        return Response({
+        return {
             "counts": counts,
             "projects": projects_list,
             "deadlines": deadlines_list,
             "team": team_list,
             "statusStats": status_stats  # camelCase for frontend
-        })
+        }
+
+
+class DashboardCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(dashboard_cache.get_stats())
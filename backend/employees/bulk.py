@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from dashboard.cache import bump_version as bump_dashboard_version
+
+from .models import Employee
+from .serializers import EmployeeImportSerializer
+
+EXPORT_FIELDS = ["id", "name", "email", "position", "department", "bio", "created_at"]
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def iter_upload_rows(upload):
+    """
+    Yield one dict per row of an uploaded .csv, .json (array) or .ndjson/.jsonl file.
+    CSV and NDJSON are read line by line, so large files never sit in memory whole.
+    """
+    name = (upload.name or "").lower()
+    if name.endswith(".csv") or upload.content_type == "text/csv":
+        reader = csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig"))
+        try:
+            yield from reader
+        except UnicodeDecodeError:
+            raise ImportFormatError(f"Line {reader.line_num + 1} is not valid UTF-8.")
+        except csv.Error as e:
+            raise ImportFormatError(f"Line {reader.line_num} is not valid CSV: {e}")
+    elif name.endswith((".ndjson", ".jsonl")):
+        number = 0
+        try:
+            for number, line in enumerate(io.TextIOWrapper(upload, encoding="utf-8"), start=1):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        raise ImportFormatError(f"Line {number} is not valid JSON.")
+        except UnicodeDecodeError:
+            raise ImportFormatError(f"Line {number + 1} is not valid UTF-8.")
+    elif name.endswith(".json") or upload.content_type == "application/json":
+        try:
+            rows = json.load(upload)
+        except ValueError:
+            raise ImportFormatError("File is not valid JSON.")
+        if not isinstance(rows, list):
+            raise ImportFormatError("JSON files must hold a list of employees.")
+        yield from rows
+    else:
+        raise ImportFormatError("Upload a .csv, .json or .ndjson file.")
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _until_format_error(rows, failures):
+    """
+    Yield rows until the upload turns out to be malformed, then stop and keep the
+    error. Only a file that fails before its first row raises ImportFormatError.
+    """
+    read = 0
+    try:
+        for row in rows:
+            read += 1
+            yield row
+    except ImportFormatError as e:
+        if not read:
+            raise
+        failures.append({"row": read + 1, "errors": {"non_field_errors": [
+            f"{e} The rest of the file was not imported."
+        ]}})
+
+
+def import_employees(user, rows):
+    """
+    Validate and insert `rows` for `user` in chunks of EMPLOYEE_IMPORT["CHUNK_SIZE"]:
+    one email IN query and one bulk INSERT per chunk. Returns
+    {"created": n, "failed": n, "errors": [{"row": 1-based index, "errors": {...}}]}.
+    Earlier chunks stay committed when a later one fails to parse, so that failure
+    is reported as an error on the row where reading stopped.
+    """
+    options = settings.EMPLOYEE_IMPORT
+    created, errors, seen = 0, [], set()
+    numbered = enumerate(islice(_until_format_error(rows, errors), options["MAX_ROWS"] + 1), start=1)
+
+    try:
+        for chunk in _chunks(numbered, options["CHUNK_SIZE"]):
+            valid = []
+            for number, row in chunk:
+                if number > options["MAX_ROWS"]:
+                    errors.append({"row": number, "errors": {"non_field_errors": [
+                        f"Imports are limited to {options['MAX_ROWS']} rows."
+                    ]}})
+                    break
+                serializer = EmployeeImportSerializer(data=row if isinstance(row, dict) else {})
+                if not serializer.is_valid():
+                    errors.append({"row": number, "errors": serializer.errors})
+                elif serializer.validated_data["email"] in seen:
+                    errors.append({"row": number, "errors": {"email": ["Duplicate email in this file."]}})
+                else:
+                    seen.add(serializer.validated_data["email"])
+                    valid.append((number, Employee(user=user, **serializer.validated_data)))
+
+            # one query replaces the per-row unique check of EmployeeSerializer
+            taken = set(
+                Employee.objects.filter(email__in=[e.email for _, e in valid]).values_list("email", flat=True)
+            )
+            fresh = []
+            for number, employee in valid:
+                if employee.email in taken:
+                    errors.append({"row": number, "errors": {"email": ["employee with this email already exists."]}})
+                else:
+                    fresh.append((number, employee))
+            created += _insert(fresh, errors)
+    finally:
+        if created:
+            # bulk_create skips post_save, so the dashboard handlers never see these rows;
+            # this runs even when a later chunk fails after earlier ones committed
+            bump_dashboard_version(user.id)
+    errors.sort(key=lambda error: error["row"])
+    return {"created": created, "failed": len(errors), "errors": errors}
+
+
+def _insert(numbered_employees, errors):
+    if not numbered_employees:
+        return 0
+    try:
+        with transaction.atomic():
+            Employee.objects.bulk_create([employee for _, employee in numbered_employees])
+        return len(numbered_employees)
+    except IntegrityError:
+        pass
+    # an email was taken between the check and the insert: find it row by row
+    created = 0
+    for number, employee in numbered_employees:
+        try:
+            with transaction.atomic():
+                employee.save()
+            created += 1
+        except IntegrityError:
+            errors.append({"row": number, "errors": {"email": ["employee with this email already exists."]}})
+    return created
+
+
+class Echo:
+    """csv.writer target that hands each formatted line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def _export_rows(queryset):
+    return queryset.order_by("id").values_list(*EXPORT_FIELDS).iterator(chunk_size=2000)
+
+
+def stream_csv(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in _export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def stream_json(queryset):
+    """A JSON array written one employee at a time; the same shape import accepts."""
+    yield "["
+    separator = ""
+    for row in _export_rows(queryset):
+        record = dict(zip(EXPORT_FIELDS, row))
+        record["created_at"] = record["created_at"] and record["created_at"].isoformat()
+        yield separator + json.dumps(record)
+        separator = ","
+    yield "]\n"
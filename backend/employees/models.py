@@ -10,5 +10,10 @@ class Employee(models.Model):
     bio = models.TextField(blank=True)
     created_at = models.DateField(auto_now_add=True,null=True,blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="employee_user_created_idx"),
+        ]
+
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -6,4 +6,13 @@ class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = '__all__'
-        read_only_fields = ['user', 'created_at']
\ No newline at end of file
+        read_only_fields = ['user', 'created_at']
+
+
+class EmployeeImportSerializer(serializers.ModelSerializer):
+    """Row validation for bulk imports; email uniqueness is checked per chunk instead."""
+
+    class Meta:
+        model = Employee
+        fields = ['name', 'email', 'position', 'department', 'bio']
+        extra_kwargs = {'email': {'validators': []}}
@@ -1,3 +1,149 @@
-from django.test import TestCase
+import csv
+import io
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from dashboard.cache import get_version
+
+from .models import Employee
+
+
+class EmployeeListPaginationTests(TestCase):
+    url = "/api/employees/all/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # created_at is a DateField, so every row ties and ordering falls back to id
+        Employee.objects.bulk_create(
+            Employee(user=self.user, name=f"e{i}", email=f"e{i}@example.com",
+                     position="Dev", department="Eng")
+            for i in range(7)
+        )
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get(self.url)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_walks_every_page_once(self):
+        names, cursor = [], None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get(self.url, params).data
+            names += [row["name"] for row in data["results"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(names, [f"e{i}" for i in range(7)])
+
+    def test_page_cost_does_not_depend_on_position(self):
+        first = self.client.get(self.url, {"limit": 2}).data
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"limit": 2, "cursor": first["next_cursor"]})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(EMPLOYEE_IMPORT={"CHUNK_SIZE": 3, "MAX_ROWS": 100})
+class EmployeeImportExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Employee.objects.create(user=self.user, name="Existing", email="taken@example.com",
+                                position="Dev", department="Eng")
+
+    def csv_upload(self, rows, name="staff.csv"):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=["name", "email", "position", "department", "bio"])
+        writer.writeheader()
+        writer.writerows(rows)
+        return SimpleUploadedFile(name, buffer.getvalue().encode(), content_type="text/csv")
+
+    def row(self, i, **overrides):
+        return {"name": f"n{i}", "email": f"n{i}@example.com", "position": "Dev", "department": "Eng",
+                "bio": "", **overrides}
+
+    def test_csv_import_reports_row_errors(self):
+        rows = [self.row(i) for i in range(7)]
+        rows[1]["email"] = "taken@example.com"
+        rows[3]["email"] = "n0@example.com"  # duplicate within the file
+        rows[5]["name"] = ""
+        rows[6]["email"] = "not-an-email"
+        version = get_version(self.user.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/employees/import/", {"file": self.csv_upload(rows)})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["failed"]), (3, 4))
+        self.assertEqual([e["row"] for e in response.data["errors"]], [2, 4, 6, 7])
+        self.assertIn("email", response.data["errors"][0]["errors"])
+        self.assertEqual(Employee.objects.filter(user=self.user).count(), 4)
+        # one email IN lookup and one INSERT per chunk of 3 rows; the last chunk has no valid row
+        lookups = [q for q in queries if 'WHERE "employees_employee"."email" IN' in q["sql"]]
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "employees_employee"')]
+        self.assertEqual((len(lookups), len(inserts)), (2, 2))
+        self.assertNotEqual(get_version(self.user.id), version)
+
+    def test_json_list_and_bad_file(self):
+        response = self.client.post("/api/employees/import/", [self.row(1), self.row(2)], format="json")
+        self.assertEqual(response.data["created"], 2)
+
+        upload = SimpleUploadedFile("staff.ndjson", b'not json\n{"name": "a"}\n')
+        response = self.client.post("/api/employees/import/", {"file": upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Line 1", response.data["error"])
+
+        upload = SimpleUploadedFile("staff.csv", b"name,email\nJos\xe9,jose@example.com\n", content_type="text/csv")
+        response = self.client.post("/api/employees/import/", {"file": upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("not valid UTF-8", response.data["error"])
+
+    def test_parse_error_after_committed_chunks_is_reported_per_row(self):
+        lines = [json.dumps(self.row(i)) for i in range(3)] + ["not json", json.dumps(self.row(9))]
+        upload = SimpleUploadedFile("staff.ndjson", "\n".join(lines).encode())
+        version = get_version(self.user.id)
+
+        with self.settings(EMPLOYEE_IMPORT={"CHUNK_SIZE": 2, "MAX_ROWS": 100}):
+            response = self.client.post("/api/employees/import/", {"file": upload})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["failed"]), (3, 1))
+        error = response.data["errors"][0]
+        self.assertEqual(error["row"], 4)
+        self.assertIn("Line 4 is not valid JSON", error["errors"]["non_field_errors"][0])
+        self.assertEqual(Employee.objects.filter(user=self.user).count(), 4)
+        self.assertNotEqual(get_version(self.user.id), version)
+
+    def test_export_round_trips_through_import(self):
+        other = User.objects.create_user(username="other")
+        Employee.objects.create(user=other, name="Hidden", email="hidden@example.com",
+                                position="Dev", department="Eng")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/employees/export/")
+            body = b"".join(response.streaming_content).decode()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        exported = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([r["email"] for r in exported], ["taken@example.com"])
+
+        response = self.client.get("/api/employees/export/", {"output": "json"})
+        records = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(records[0]["name"], "Existing")
+
+        Employee.objects.all().delete()
+        upload = SimpleUploadedFile("staff.json", json.dumps(records).encode(), content_type="application/json")
+        self.assertEqual(self.client.post("/api/employees/import/", {"file": upload}).data["created"], 1)
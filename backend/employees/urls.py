@@ -1,9 +1,14 @@
 from django.urls import path
-from .views import EmployeeCreateView, EmployeeListView, EmployeeDetailView,EmployeeCountView
+from .views import (
+    EmployeeCreateView, EmployeeListView, EmployeeDetailView, EmployeeCountView, EmployeeExportView,
+    EmployeeImportView,
+)
 
 urlpatterns = [
     path('add/', EmployeeCreateView.as_view()),       # POST
     path('all/', EmployeeListView.as_view()),         # GET
     path('count/',EmployeeCountView.as_view()),       # GETCOUNT
+    path('import/', EmployeeImportView.as_view()),    # POST csv/json file or list
+    path('export/', EmployeeExportView.as_view()),    # GET ?output=csv|json (streamed)
     path('<int:pk>/', EmployeeDetailView.as_view()),  # GET, PUT, DELETE
 ]
@@ -3,9 +3,15 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Employee
 from .serializers import EmployeeSerializer
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 
+from backend.pagination import KeysetPagination
+
+from .bulk import ImportFormatError, import_employees, iter_upload_rows, stream_csv, stream_json
+
 # EmployeeCreateView
 class EmployeeCreateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -17,6 +23,48 @@ class EmployeeCreateView(APIView):
             return Response(EmployeeSerializer(employee).data, status=201)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class EmployeeImportView(APIView):
+    """
+    POST a .csv/.json/.ndjson file as "file", or a JSON list of employees. Valid rows
+    are created; the response lists the 1-based row numbers that were rejected.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, JSONParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is not None:
+            rows = iter_upload_rows(upload)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            rows = request.data.get("employees")
+            if not isinstance(rows, list):
+                return Response({"error": "Upload a file or send a list of employees."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = import_employees(request.user, rows)
+        except ImportFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED if result["created"] else status.HTTP_400_BAD_REQUEST)
+
+
+class EmployeeExportView(APIView):
+    """Stream every employee as CSV (default) or, with ?output=json, a JSON array."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        employees = Employee.objects.filter(user=request.user)
+        if request.query_params.get("output") == "json":
+            response = StreamingHttpResponse(stream_json(employees), content_type="application/json")
+            response["Content-Disposition"] = 'attachment; filename="employees.json"'
+        else:
+            response = StreamingHttpResponse(stream_csv(employees), content_type="text/csv")
+            response["Content-Disposition"] = 'attachment; filename="employees.csv"'
+        return response
+
+
 class EmployeeCountView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -29,6 +77,10 @@ class EmployeeListView(APIView):
 
     def get(self, request):
         employees = Employee.objects.filter(user=request.user)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(employees, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(EmployeeSerializer(page, many=True).data)
         serializer = EmployeeSerializer(employees, many=True)
         return Response(serializer.data)
     
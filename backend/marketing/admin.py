@@ -1,8 +1,9 @@
 from django.contrib import admin
-from .models import Poster,SocialAccount
+from .models import Poster, PosterJob, SocialAccount
 
 # Register your models here.
 
 
 admin.site.register(Poster)
 admin.site.register(SocialAccount)
+admin.site.register(PosterJob)
@@ -0,0 +1,248 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from django.core.files import File
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_TIMEOUT = 60
+PING_TIMEOUT = 5
+
+
+class TemporaryRenderFile(File):
+    """
+    A render the backend left in a temp file. Exposing temporary_file_path() lets
+    FileSystemStorage move it into place instead of copying it.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+class RenderedImage:
+    """
+    Where a backend left its output: a local file or a remote URL. Nothing is read
+    until the image is opened, and then only as a stream.
+    """
+
+    def __init__(self, location, temporary=False):
+        self.location = location
+        self.temporary = temporary
+
+    @property
+    def is_remote(self):
+        return self.location.startswith(("http://", "https://"))
+
+    @contextmanager
+    def open(self):
+        """Yield a django File that reads the image in chunks."""
+        if self.is_remote:
+            with requests.get(self.location, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                yield File(response.raw, name=os.path.basename(self.location))
+            return
+        file_class = TemporaryRenderFile if self.temporary else File
+        with open(self.location, "rb") as fh:
+            yield file_class(fh)
+
+    def discard(self):
+        """Remove a temp file that was not moved into storage."""
+        if self.temporary and not self.is_remote and os.path.exists(self.location):
+            os.remove(self.location)
+
+
+class PosterBackend:
+    """
+    Interface for poster image generators. generate() returns a RenderedImage and a
+    dict of timings in seconds.
+    """
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+
+class PoolTimeout(TimeoutError):
+    """No pooled client became free within the checkout timeout."""
+
+
+def ping_client(client):
+    """Cheap liveness probe: the Space still serves its config to this client's session."""
+    from urllib.parse import urljoin
+
+    from gradio_client.utils import CONFIG_URL
+    response = requests.get(
+        urljoin(client.src, CONFIG_URL), headers=client.headers, cookies=client.cookies, timeout=PING_TIMEOUT,
+    )
+    return response.ok
+
+
+class GradioClientPool:
+    """
+    Lazily created, thread-safe pool of gradio Clients for one Space.
+
+    Creating a Client performs the Space handshake and config fetch, so clients are
+    reused across generations. A client is dropped when it fails or grows older than
+    max_age, and the next checkout connects a fresh one. A client that sat idle for
+    ping_after seconds is probed with ping(client) first, so a connection the Space
+    dropped meanwhile costs a config GET rather than a failed predict.
+    """
+
+    def __init__(self, space_id, size=2, max_age=30 * 60, client_factory=None, ping=ping_client, ping_after=60):
+        self.space_id = space_id
+        self.size = size
+        self.max_age = max_age
+        self.client_factory = client_factory
+        self.ping = ping
+        self.ping_after = ping_after
+        self._idle = []
+        self._created = 0
+        # signalled whenever a client comes back or a slot frees up
+        self._available = threading.Condition()
+
+    def _connect(self):
+        factory = self.client_factory
+        if factory is None:
+            from gradio_client import Client
+            factory = Client
+        now = time.monotonic()
+        return {"client": factory(self.space_id), "created": now, "used": now}
+
+    def _expired(self, entry):
+        return time.monotonic() - entry["created"] >= self.max_age
+
+    def _alive(self, entry):
+        if time.monotonic() - entry["used"] < self.ping_after:
+            return True
+        try:
+            alive = self.ping(entry["client"])
+        except Exception as e:
+            logger.info("Gradio client for %s failed its ping (%s); reconnecting", self.space_id, e)
+            return False
+        if not alive:
+            logger.info("Gradio client for %s failed its ping; reconnecting", self.space_id)
+        return alive
+
+    def _discard(self, entry):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _release(self, entry):
+        entry["used"] = time.monotonic()
+        with self._available:
+            self._idle.append(entry)
+            self._available.notify()
+
+    def _reserve(self, deadline, timeout):
+        """An idle client that is not expired, or None once a slot for a new one is taken."""
+        with self._available:
+            while True:
+                while self._idle:
+                    entry = self._idle.pop()
+                    if not self._expired(entry):
+                        return entry
+                    self._created -= 1
+                if self._created < self.size:
+                    self._created += 1
+                    return None
+                # every client is busy: wait for one to come back or be dropped
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No Gradio client free after {timeout}s")
+                self._available.wait(remaining)
+
+    def _checkout(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            entry = self._reserve(deadline, timeout)
+            if entry is None:
+                break
+            # probe outside the lock: it is a network round trip
+            if self._alive(entry):
+                return entry
+            self._discard(entry)
+        try:
+            return self._connect()
+        except Exception:
+            self._discard(None)
+            raise
+
+    @contextmanager
+    def client(self, timeout=None):
+        entry = self._checkout(timeout)
+        try:
+            yield entry["client"]
+        except Exception:
+            self._discard(entry)
+            raise
+        self._release(entry)
+
+
+class GradioBackend(PosterBackend):
+    """Generates posters on a Hugging Face Space through a shared client pool."""
+
+    def __init__(self, space_id=None, pool_size=None, client_factory=None):
+        options = getattr(settings, "POSTER_GRADIO", {})
+        self.space_id = space_id or options.get("SPACE_ID", "Parth2005147/Pollinations-Image-Generator")
+        self.pool = GradioClientPool(
+            self.space_id,
+            size=pool_size or options.get("POOL_SIZE", 2),
+            max_age=options.get("CLIENT_MAX_AGE", 30 * 60),
+            client_factory=client_factory,
+            ping_after=options.get("PING_AFTER", 60),
+        )
+        self.checkout_timeout = options.get("CHECKOUT_TIMEOUT", 120)
+
+    def predict(self, prompt, timings):
+        started = time.monotonic()
+        with self.pool.client(timeout=self.checkout_timeout) as client:
+            timings["connect"] = time.monotonic() - started
+            started = time.monotonic()
+            result = client.predict(prompt, api_name="/predict")
+            timings["predict"] = time.monotonic() - started
+        return result
+
+    def generate(self, prompt):
+        timings = {}
+        try:
+            result = self.predict(prompt, timings)
+        except PoolTimeout:
+            # every client stayed busy; queuing up again would only double the wait
+            raise
+        except Exception as e:
+            # the failed client was dropped; reconnect once before giving up
+            logger.warning("Gradio predict failed (%s); retrying on a fresh client", e)
+            result = self.predict(prompt, timings)
+
+        # If it's a list, take the first item
+        if isinstance(result, list) and result:
+            result = result[0]
+
+        result = str(result)
+
+        # gradio_client downloads outputs into a per-call temp dir, which we own from here
+        if os.path.exists(result):
+            return RenderedImage(result, temporary=True), timings
+        if result.startswith("http"):
+            return RenderedImage(result), timings
+        raise ValueError(f"Unexpected result format: {result}")
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_poster_backend():
+    """Process-wide instance of the backend class named by settings.POSTER_BACKEND."""
+    path = settings.POSTER_BACKEND
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
@@ -0,0 +1,72 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+def prompt_key(user_id, enhanced_prompt):
+    """
+    Content address of one user's prompt. Only whitespace is normalized: case is part
+    of the text the poster renders. Keys are per user, so a hit never hands out
+    another tenant's file or reveals that they used the same prompt.
+    """
+    normalized = " ".join(enhanced_prompt.split())
+    return hashlib.sha256(f"{user_id}:{normalized}".encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """
+    Thread-safe LRU map from prompt_key() to a rendered poster, bounded by entry
+    count and age. Values are {"image": <storage name>, "public_url": <url or None>}.
+    """
+
+    def __init__(self, max_entries=256, ttl=24 * 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prompt_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            options = settings.POSTER_PROMPT_CACHE
+            _cache = PromptCache(max_entries=options["MAX_ENTRIES"], ttl=options["TTL"])
+        return _cache
@@ -0,0 +1,58 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+DERIVATIVES = ("thumbnail", "medium")
+
+
+def derivative_name(name, label):
+    """generated_posters/poster_1_ab.png -> generated_posters/poster_1_ab.thumbnail.webp"""
+    root, _ = os.path.splitext(name)
+    return f"{root}.{label}.webp"
+
+
+def dhash(image, hash_size=8):
+    """64-bit difference hash as 16 hex chars; near-identical images differ in few bits."""
+    gray = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+
+def build_derivatives(name, force=False):
+    """
+    Write WebP thumbnail and medium copies of the stored image `name` next to it and
+    return {"thumbnail": name, "medium": name, "phash": hex}. Existing derivatives are
+    kept unless force is set, so running this twice does no extra work.
+    """
+    options = settings.POSTER_DERIVATIVES
+    with default_storage.open(name, "rb") as fh:
+        image = Image.open(fh)
+        image.load()
+
+    result = {"phash": dhash(image)}
+    for label in DERIVATIVES:
+        target = derivative_name(name, label)
+        if default_storage.exists(target):
+            if not force:
+                result[label] = target
+                continue
+            default_storage.delete(target)
+
+        copy = image.convert("RGBA") if image.mode in ("P", "LA") else image.copy()
+        size = options["SIZES"][label]
+        copy.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        copy.save(buffer, "WEBP", quality=options["QUALITY"], method=4)
+        result[label] = default_storage.save(target, ContentFile(buffer.getvalue()))
+    return result
+
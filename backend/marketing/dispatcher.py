@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+
+from .models import Poster, ScheduledPost
+from .services import post_to_facebook, post_to_instagram
+from .uploader import enqueue_upload, needs_requeue
+
+logger = logging.getLogger(__name__)
+
+# Graph API error codes for app, user, page and per-call throttling
+RATE_LIMIT_CODES = {4, 17, 32, 613}
+
+PUBLISHERS = {
+    ScheduledPost.FACEBOOK: (post_to_facebook, "fb_page_id", "page_id"),
+    ScheduledPost.INSTAGRAM: (post_to_instagram, "instagram_id", "instagram_id"),
+}
+# Graph calls per publish: Instagram creates a container, then publishes it
+CALLS_PER_POST = {ScheduledPost.FACEBOOK: 1, ScheduledPost.INSTAGRAM: 2}
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`; take() never blocks."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, count=1):
+        with self._lock:
+            self._refill()
+            if self.tokens < count:
+                return False
+            self.tokens -= count
+            return True
+
+    def wait_time(self, count=1):
+        """Seconds until `count` tokens will have accumulated."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (count - self.tokens) / self.rate)
+
+    def drain(self):
+        """Graph said we are throttled: spend everything so the bucket has to refill."""
+        with self._lock:
+            self.tokens = 0
+            self.updated = time.monotonic()
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(access_token):
+    """One bucket per access token, since Graph rate limits are counted per token."""
+    options = settings.SOCIAL_DISPATCH
+    key = hashlib.sha256(access_token.encode()).hexdigest()
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(options["RATE_PER_HOUR"] / 3600, options["BURST"])
+        return _buckets[key]
+
+
+def is_rate_limited(result):
+    details = result.get("details")
+    error = details.get("error") if isinstance(details, dict) else None
+    return isinstance(error, dict) and error.get("code") in RATE_LIMIT_CODES
+
+
+def retry_delay(attempt):
+    """Exponential backoff with equal jitter, capped at MAX_BACKOFF seconds."""
+    options = settings.SOCIAL_DISPATCH
+    delay = min(options["MAX_BACKOFF"], options["BACKOFF"] * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def publish_group(access_token, items):
+    """
+    Publish one account's posts in order, spending its token bucket. Once the bucket
+    runs dry, the rest come back as {"deferred": seconds}: how long until the bucket
+    covers each of them, in order. Runs on a worker thread: only HTTP here, no ORM.
+    """
+    bucket = get_bucket(access_token)
+    outcomes = {}
+    owed = 0
+    for pk, platform, kwargs in items:
+        if owed or not bucket.take(CALLS_PER_POST[platform]):
+            owed += CALLS_PER_POST[platform]
+            outcomes[pk] = {"deferred": bucket.wait_time(owed)}
+            continue
+        publish = PUBLISHERS[platform][0]
+        try:
+            result = publish(access_token=access_token, **kwargs)
+        except Exception as e:
+            result = {"error": str(e)}
+        if is_rate_limited(result):
+            bucket.drain()
+        outcomes[pk] = result
+    return outcomes
+
+
+def claim_due_posts(now):
+    options = settings.SOCIAL_DISPATCH
+    # rows left in "publishing" by a crashed dispatcher go back to the queue
+    ScheduledPost.objects.filter(
+        status=ScheduledPost.PUBLISHING, claimed_at__lt=now - timedelta(seconds=options["STALE_AFTER"])
+    ).update(status=ScheduledPost.SCHEDULED, claimed_at=None)
+
+    due = list(
+        ScheduledPost.objects.filter(status=ScheduledPost.SCHEDULED, due_at__lte=now)
+        .order_by("due_at", "id").values_list("pk", flat=True)[:options["BATCH_SIZE"]]
+    )
+    ScheduledPost.objects.filter(pk__in=due, status=ScheduledPost.SCHEDULED).update(
+        status=ScheduledPost.PUBLISHING, claimed_at=now
+    )
+    return list(
+        ScheduledPost.objects.filter(pk__in=due, status=ScheduledPost.PUBLISHING, claimed_at=now)
+        .select_related("poster", "user__socialaccount").order_by("due_at", "id")
+    )
+
+
+def dispatch_due_posts():
+    """
+    Publish a batch of due ScheduledPosts. Posts are grouped by access token and each
+    group is published on its own worker, so throughput grows with the number of
+    accounts while every token stays inside its bucket. Returns a stats dict.
+    """
+    options = settings.SOCIAL_DISPATCH
+    started = time.monotonic()
+    now = timezone.now()
+    posts = claim_due_posts(now)
+    stats = {"claimed": len(posts), "published": 0, "retried": 0, "failed": 0, "deferred": 0}
+
+    by_pk = {post.pk: post for post in posts}
+    groups = defaultdict(list)
+    deferred = []
+    for post in posts:
+        try:
+            account = post.user.socialaccount
+        except ObjectDoesNotExist:
+            account = None
+        _, account_field, argument = PUBLISHERS[post.platform]
+        if account is None or not account.access_token:
+            finish(post, ScheduledPost.FAILED, stats, error="No social account connected.")
+        elif not getattr(account, account_field):
+            finish(post, ScheduledPost.FAILED, stats, error=f"Missing {account_field} in your SocialAccount.")
+        elif not post.poster.public_url:
+            if needs_requeue(post.poster, now):
+                enqueue_upload(post.poster_id)
+            if post.poster.upload_status == Poster.UPLOAD_FAILED:
+                retry(post, "Uploading the poster failed; it has been queued again.", now, stats)
+            else:
+                # still uploading: wait for it without spending an attempt
+                deferred.append(defer(post, now, options["BACKOFF"]))
+        else:
+            groups[account.access_token].append((post.pk, post.platform, {
+                argument: getattr(account, account_field),
+                "image_url": post.poster.public_url,
+                "caption": post.caption,
+            }))
+
+    outcomes = {}
+    if groups:
+        with ThreadPoolExecutor(
+            max_workers=min(options["WORKERS"], len(groups)), thread_name_prefix="social-dispatch"
+        ) as pool:
+            for group in pool.map(lambda item: publish_group(*item), groups.items()):
+                outcomes.update(group)
+
+    for pk, result in outcomes.items():
+        if "deferred" in result:
+            deferred.append(defer(by_pk[pk], now, result["deferred"]))
+        elif "id" in result:
+            finish(by_pk[pk], ScheduledPost.PUBLISHED, stats, result=result)
+        else:
+            retry(by_pk[pk], result.get("error", "Unknown error"), now, stats, result=result)
+    if deferred:
+        ScheduledPost.objects.bulk_update(deferred, ["status", "due_at", "claimed_at"])
+        stats["deferred"] = len(deferred)
+
+    stats["elapsed"] = round(time.monotonic() - started, 3)
+    logger.info(
+        "Social dispatch: %(claimed)d posts in %(elapsed).2fs (%(published)d published, %(retried)d retrying, "
+        "%(failed)d failed, %(deferred)d deferred)",
+        stats,
+    )
+    return stats
+
+
+def defer(post, now, seconds):
+    """
+    Push a post that cannot go out yet (its bucket is empty, its poster is still
+    uploading) `seconds` ahead. Left at its old due_at, a throttled account's backlog
+    would fill every batch and starve other accounts. Not an attempt: nothing was sent.
+    """
+    post.status = ScheduledPost.SCHEDULED
+    post.due_at = now + timedelta(seconds=seconds)
+    post.claimed_at = None
+    return post
+
+
+def finish(post, status, stats, result=None, error=""):
+    post.status = status
+    post.result = result
+    post.error = error
+    post.claimed_at = None
+    if status == ScheduledPost.PUBLISHED:
+        post.published_at = timezone.now()
+    post.save(update_fields=["status", "attempts", "result", "error", "claimed_at", "published_at"])
+    stats["published" if status == ScheduledPost.PUBLISHED else "failed"] += 1
+
+
+def retry(post, error, now, stats, result=None):
+    post.attempts += 1
+    if post.attempts >= settings.SOCIAL_DISPATCH["MAX_ATTEMPTS"]:
+        return finish(post, ScheduledPost.FAILED, stats, result=result, error=error)
+    post.status = ScheduledPost.SCHEDULED
+    post.due_at = now + timedelta(seconds=retry_delay(post.attempts))
+    post.result = result
+    post.error = error
+    post.claimed_at = None
+    post.save(update_fields=["status", "due_at", "attempts", "result", "error", "claimed_at"])
+    stats["retried"] += 1
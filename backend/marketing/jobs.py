@@ -0,0 +1,251 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .cache import get_prompt_cache, prompt_key
+from .derivatives import build_derivatives
+from .models import Poster, PosterJob
+from .services import build_enhanced_prompt, generate_poster_image
+from .uploader import enqueue_upload, upload_with_retries
+
+logger = logging.getLogger(__name__)
+
+# Poster fields filled from a render; shared by every poster reusing a cached render
+RENDER_FIELDS = ("image", "public_url", "thumbnail", "medium", "phash")
+
+_executor = None
+_executor_lock = threading.Lock()
+# job ids waiting in or running on this process's pool
+_submitted = set()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POSTER_JOB_WORKERS, thread_name_prefix="poster-job"
+            )
+        return _executor
+
+
+def submit(job_id):
+    """Run the job on this process's pool, unless it is already waiting there."""
+    if settings.POSTER_JOBS_EAGER:
+        return run_job(job_id)
+    with _executor_lock:
+        if job_id in _submitted:
+            return
+        _submitted.add(job_id)
+    get_executor().submit(_run_in_worker, job_id)
+
+
+def enqueue(job):
+    """Hand the job to the worker pool once the row that describes it is committed."""
+    transaction.on_commit(lambda: submit(job.pk))
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+        with _executor_lock:
+            _submitted.discard(job_id)
+
+
+def recover_jobs():
+    """
+    Requeue jobs a restart left behind. The pool lives in memory, so jobs queued on
+    or running in a process that exited are otherwise never picked up again; any job
+    queued, or running, for longer than POSTER_JOB_STALE_AFTER seconds is treated as
+    stranded. run_job's claim keeps a job that is in fact still waiting elsewhere
+    from generating twice. Returns the number of jobs resubmitted.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.POSTER_JOB_STALE_AFTER)
+    PosterJob.objects.filter(status=PosterJob.RUNNING, started_at__lt=cutoff).update(
+        status=PosterJob.QUEUED, started_at=None
+    )
+    stranded = list(
+        PosterJob.objects.filter(status=PosterJob.QUEUED, created_at__lt=cutoff)
+        .order_by("created_at").values_list("pk", flat=True)
+    )
+    if stranded:
+        logger.warning("Requeuing %d stranded poster job(s)", len(stranded))
+    for job_id in stranded:
+        submit(job_id)
+    return len(stranded)
+
+
+def render_poster(user_id, enhanced_prompt):
+    """
+    Generate an image, stream it into default_storage and build its derivatives,
+    returning a dict keyed by RENDER_FIELDS. With POSTER_PERSIST_LOCAL off the render
+    is sent straight to Cloudinary instead and only public_url is set.
+    """
+    rendered, timings = generate_poster_image(enhanced_prompt)
+    name = f"generated_posters/poster_{user_id}_{uuid.uuid4().hex}.png"
+    result = dict.fromkeys(RENDER_FIELDS)
+    result["phash"] = ""
+    started = time.monotonic()
+    try:
+        if settings.POSTER_PERSIST_LOCAL:
+            with rendered.open() as content:
+                name = result["image"] = default_storage.save(name, content)
+            timings["store"] = time.monotonic() - started
+        else:
+            url, error = upload_with_retries(lambda: rendered.location, name)
+            if not url:
+                raise RuntimeError(f"Cloudinary upload failed: {error}")
+            name = result["public_url"] = url
+            timings["upload"] = time.monotonic() - started
+    finally:
+        rendered.discard()
+
+    if result["image"]:
+        started = time.monotonic()
+        try:
+            result.update(build_derivatives(name))
+        except Exception as e:
+            # the poster is still usable; the backfill command can retry later
+            logger.warning("Could not build derivatives for %s: %s", name, e)
+        timings["derivatives"] = time.monotonic() - started
+
+    logger.info(
+        "Rendered %s (%s)", name,
+        ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items()),
+    )
+    return result
+
+
+def lookup_render(user_id, enhanced_prompt):
+    """The user's previous render of the same prompt, if its image is still in storage."""
+    if not settings.POSTER_PROMPT_CACHE["ENABLED"]:
+        return None
+    key = prompt_key(user_id, enhanced_prompt)
+    cached = get_prompt_cache().get(key)
+    if cached and cached["image"] and not default_storage.exists(cached["image"]):
+        get_prompt_cache().discard(key)
+        return None
+    return cached
+
+
+def remember_render(enhanced_prompt, poster):
+    """Cache the poster's render for its owner's later requests of the same prompt."""
+    if settings.POSTER_PROMPT_CACHE["ENABLED"]:
+        render = {field: getattr(poster, field) for field in RENDER_FIELDS}
+        for field in ("image", "thumbnail", "medium"):
+            render[field] = render[field].name or None
+        get_prompt_cache().set(prompt_key(poster.user_id, enhanced_prompt), render)
+
+
+def obtain_render(user_id, enhanced_prompt, use_cache=True):
+    """Reuse a cached render of the prompt when allowed, otherwise generate one."""
+    cached = lookup_render(user_id, enhanced_prompt) if use_cache else None
+    if cached:
+        return {**cached, "from_cache": True}
+    return {**render_poster(user_id, enhanced_prompt), "from_cache": False}
+
+
+def run_job(job_id):
+    # claim the job so a duplicate submission can never generate twice
+    claimed = PosterJob.objects.filter(pk=job_id, status=PosterJob.QUEUED).update(
+        status=PosterJob.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return
+    job = PosterJob.objects.get(pk=job_id)
+
+    try:
+        enhanced_prompt = build_enhanced_prompt(job.prompt, job.industry, job.design_style, job.tone)
+        render = obtain_render(job.user_id, enhanced_prompt, job.use_cache)
+        job.from_cache = render["from_cache"]
+
+        # Save only original prompt & dropdown values in DB
+        job.poster = Poster.objects.create(
+            user_id=job.user_id,
+            prompt=job.prompt,
+            industry=job.industry,
+            design_style=job.design_style,
+            tone=job.tone,
+            **{field: render[field] for field in RENDER_FIELDS},
+            upload_status=Poster.UPLOAD_UPLOADED if render["public_url"] else Poster.UPLOAD_PENDING,
+            caption=job.caption,
+        )
+        if not render["public_url"]:
+            enqueue_upload(job.poster.pk)
+        if not render["from_cache"] and job.use_cache:
+            remember_render(enhanced_prompt, job.poster)
+        job.status = PosterJob.SUCCEEDED
+    except Exception as e:
+        logger.exception("Poster job %s failed", job_id)
+        job.status = PosterJob.FAILED
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["poster", "status", "error", "from_cache", "finished_at"])
+
+
+def run_batch(user, variants, parallelism, use_cache=True):
+    """
+    Create one Poster row per variant in a single bulk_create, render the variants
+    concurrently (at most `parallelism` at a time) and yield (poster, error) pairs in
+    completion order. Rows whose render fails are deleted.
+    """
+    posters = Poster.objects.bulk_create(
+        Poster(
+            user=user,
+            prompt=variant["prompt"],
+            industry=variant["industry"],
+            design_style=variant["design_style"],
+            tone=variant["tone"],
+            caption=variant["caption"],
+        )
+        for variant in variants
+    )
+    prompts = [
+        build_enhanced_prompt(v["prompt"], v["industry"], v["design_style"], v["tone"]) for v in variants
+    ]
+
+    pending = set(range(len(posters)))
+    pool = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="poster-batch")
+    try:
+        # workers only render files; the rows are written here, on the streaming thread
+        futures = {
+            pool.submit(obtain_render, user.id, prompt, use_cache): index for index, prompt in enumerate(prompts)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            pending.discard(index)
+            poster = posters[index]
+            try:
+                render = future.result()
+                for field in RENDER_FIELDS:
+                    setattr(poster, field, render[field])
+                if render["public_url"]:
+                    poster.upload_status = Poster.UPLOAD_UPLOADED
+                poster.save(update_fields=[*RENDER_FIELDS, "upload_status"])
+                if not render["public_url"]:
+                    enqueue_upload(poster.pk)
+                if not render["from_cache"] and use_cache:
+                    remember_render(prompts[index], poster)
+            except Exception as e:
+                logger.warning("Batch poster %s failed: %s", poster.pk, e)
+                poster.delete()
+                yield index, poster, str(e)
+            else:
+                yield index, poster, None
+    finally:
+        # the client may stop reading mid-stream: drop queued renders and unfilled rows
+        pool.shutdown(wait=False, cancel_futures=True)
+        if pending:
+            Poster.objects.filter(pk__in=[posters[i].pk for i in pending]).delete()
@@ -0,0 +1,43 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from marketing.derivatives import build_derivatives
+from marketing.models import Poster
+
+
+class Command(BaseCommand):
+    help = "Build WebP thumbnail/medium derivatives and perceptual hashes for stored posters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild derivatives even for posters that already have them.",
+        )
+
+    def handle(self, *args, **options):
+        posters = Poster.objects.exclude(image="").exclude(image=None)
+        if not options["force"]:
+            posters = posters.filter(Q(thumbnail="") | Q(thumbnail=None) | Q(medium="") | Q(medium=None) | Q(phash=""))
+        # cached prompt renders share one image file, so derive once per file
+        names = sorted(set(posters.values_list("image", flat=True)))
+
+        built = missing = failed = 0
+        for name in names:
+            if not default_storage.exists(name):
+                missing += 1
+                self.stderr.write(f"Missing file: {name}")
+                continue
+            try:
+                derivatives = build_derivatives(name, force=options["force"])
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Could not process {name}: {e}")
+                continue
+            Poster.objects.filter(image=name).update(**derivatives)
+            built += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {built} image(s); {missing} missing, {failed} failed."
+        ))
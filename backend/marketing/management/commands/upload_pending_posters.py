@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from marketing.models import Poster
+from marketing.uploader import upload_poster
+
+
+class Command(BaseCommand):
+    help = "Upload posters whose Cloudinary upload is still pending or has failed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--failed-only",
+            action="store_true",
+            help="Only retry posters whose upload already failed.",
+        )
+
+    def handle(self, *args, **options):
+        statuses = [Poster.UPLOAD_FAILED] if options["failed_only"] else [Poster.UPLOAD_PENDING, Poster.UPLOAD_FAILED]
+        poster_ids = list(
+            Poster.objects.filter(upload_status__in=statuses).exclude(image="").exclude(image=None)
+            .values_list("pk", flat=True)
+        )
+        for poster_id in poster_ids:
+            upload_poster(poster_id)
+
+        uploaded = Poster.objects.filter(pk__in=poster_ids, upload_status=Poster.UPLOAD_UPLOADED).count()
+        self.stdout.write(self.style.SUCCESS(f"Uploaded {uploaded} of {len(poster_ids)} poster(s)."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0013_alter_socialaccount_access_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='poster_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0015_posterjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posterjob',
+            name='from_cache',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='posterjob',
+            name='use_cache',
+            field=models.BooleanField(default=True),
+        ),
+    ]
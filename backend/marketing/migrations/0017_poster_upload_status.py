@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+def mark_uploaded_posters(apps, schema_editor):
+    Poster = apps.get_model('marketing', 'Poster')
+    Poster.objects.exclude(public_url__isnull=True).exclude(public_url='').update(upload_status='uploaded')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0016_posterjob_cache_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poster',
+            name='upload_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='poster',
+            name='upload_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('uploaded', 'Uploaded'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_uploaded_posters, migrations.RunPython.noop),
+    ]
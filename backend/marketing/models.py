@@ -1,8 +1,17 @@
 from django.db import models
 from django.contrib.auth.models import User
-from .utils import upload_to_cloudinary  
+
 
 class Poster(models.Model):
+    UPLOAD_PENDING = "pending"
+    UPLOAD_UPLOADED = "uploaded"
+    UPLOAD_FAILED = "failed"
+    UPLOAD_STATUS_CHOICES = [
+        (UPLOAD_PENDING, "Pending"),
+        (UPLOAD_UPLOADED, "Uploaded"),
+        (UPLOAD_FAILED, "Failed"),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True)
     prompt = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to="generated_posters/", blank=True, null=True)
@@ -12,13 +21,18 @@ class Poster(models.Model):
     public_url = models.URLField(blank=True, null=True)  # keep same field
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     caption = models.TextField(blank=True, null=True)  
+    # Cloudinary upload runs in the background (marketing.uploader); public_url is set once uploaded
+    upload_status = models.CharField(max_length=20, choices=UPLOAD_STATUS_CHOICES, default=UPLOAD_PENDING)
+    upload_error = models.TextField(blank=True)
+    # WebP copies stored next to image (marketing.derivatives); lists only ship these
+    thumbnail = models.ImageField(blank=True, null=True, editable=False)
+    medium = models.ImageField(blank=True, null=True, editable=False)
+    phash = models.CharField(max_length=16, blank=True, editable=False)
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)  # save local file first
-        if self.image and not self.public_url:
-            uploaded_url = upload_to_cloudinary(self.image.path)
-            self.public_url = uploaded_url
-            super().save(update_fields=["public_url"])
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="poster_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"Poster ({self.id}) - {self.prompt[:30]}"
@@ -32,4 +46,84 @@ class SocialAccount(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.user.username} - {self.fb_page_id or self.instagram_id}"
\ No newline at end of file
+        return f"{self.user.username} - {self.fb_page_id or self.instagram_id}"
+
+class PosterJob(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="poster_jobs")
+    prompt = models.TextField()
+    industry = models.CharField(max_length=100, blank=True)
+    design_style = models.CharField(max_length=100, blank=True)
+    tone = models.CharField(max_length=100, blank=True)
+    caption = models.TextField(blank=True)
+    use_cache = models.BooleanField(default=True)
+    from_cache = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    poster = models.OneToOneField(Poster, on_delete=models.SET_NULL, blank=True, null=True, related_name="job")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def __str__(self):
+        return f"PosterJob ({self.id}) - {self.status}"
+
+
+class ScheduledPost(models.Model):
+    """One poster queued for one platform; published by marketing.dispatcher."""
+    FACEBOOK = "facebook"
+    INSTAGRAM = "instagram"
+    PLATFORM_CHOICES = [
+        (FACEBOOK, "Facebook"),
+        (INSTAGRAM, "Instagram"),
+    ]
+
+    SCHEDULED = "scheduled"
+    PUBLISHING = "publishing"
+    PUBLISHED = "published"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (SCHEDULED, "Scheduled"),
+        (PUBLISHING, "Publishing"),
+        (PUBLISHED, "Published"),
+        (FAILED, "Failed"),
+        (CANCELLED, "Cancelled"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="scheduled_posts")
+    poster = models.ForeignKey(Poster, on_delete=models.CASCADE, related_name="scheduled_posts")
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
+    caption = models.TextField(blank=True)
+    publish_at = models.DateTimeField()
+    # when the dispatcher should next try; starts at publish_at and moves on retries
+    due_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=SCHEDULED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "due_at"], name="scheduledpost_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"ScheduledPost ({self.id}) - {self.platform} {self.status}"
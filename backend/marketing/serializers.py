@@ -1,22 +1,70 @@
 from rest_framework import serializers
-from .models import Poster,SocialAccount
+from .models import Poster, PosterJob, ScheduledPost, SocialAccount
+
+def absolute_file_url(request, file):
+    return request.build_absolute_uri(file.url) if file else None
+
 
 class PosterSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    medium = serializers.SerializerMethodField()
 
     class Meta:
         model = Poster
         fields = '__all__'
-        read_only_fields = ['user', 'image']
+        read_only_fields = ['user', 'image', 'upload_status', 'upload_error']
 
     def get_image(self, obj):
-        request = self.context.get('request')
         if obj.image:
-            return request.build_absolute_uri(obj.image.url)
-        return None
+            return absolute_file_url(self.context.get('request'), obj.image)
+        # posters rendered with POSTER_PERSIST_LOCAL off only exist on Cloudinary
+        return obj.public_url
+
+    def get_thumbnail(self, obj):
+        return absolute_file_url(self.context.get('request'), obj.thumbnail)
+
+    def get_medium(self, obj):
+        return absolute_file_url(self.context.get('request'), obj.medium)
+
+
+class PosterListSerializer(PosterSerializer):
+    """Gallery rows: derivatives and public_url only, never the full-size original."""
+
+    class Meta(PosterSerializer.Meta):
+        fields = [
+            'id', 'user', 'prompt', 'industry', 'design_style', 'tone', 'caption', 'created_at',
+            'public_url', 'upload_status', 'upload_error', 'thumbnail', 'medium', 'phash',
+        ]
+
+
+class PosterJobSerializer(serializers.ModelSerializer):
+    poster = PosterSerializer(read_only=True)
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PosterJob
+        fields = [
+            "id", "status", "poster", "error", "from_cache",
+            "created_at", "started_at", "finished_at", "status_url",
+        ]
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        return self.context['request'].build_absolute_uri(f"/api/marketing/jobs/{obj.id}/")
     
     
 class SocialAccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = SocialAccount
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+
+class ScheduledPostSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScheduledPost
+        fields = [
+            "id", "poster", "platform", "caption", "publish_at", "status", "attempts",
+            "due_at", "result", "error", "created_at", "published_at",
+        ]
+        read_only_fields = fields
@@ -1,64 +1,85 @@
-from gradio_client import Client
-import shutil
-import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-SPACE_ID = "Parth2005147/Pollinations-Image-Generator"
-
-def generate_poster_image(prompt, output_path):
-    try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        client = Client(SPACE_ID)
-        result = client.predict(prompt, api_name="/predict")
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
-        # If it's a list, take the first item
-        if isinstance(result, list) and result:
-            result = result[0]
+from .backends import get_poster_backend
 
-        result = str(result)
 
-        # If result is a local file path
-        if os.path.exists(result):
-            shutil.copy(result, output_path)
-        # If it's a URL, download it
-        elif result.startswith("http"):
-            import urllib.request
-            urllib.request.urlretrieve(result, output_path)
-        else:
-            raise ValueError(f"Unexpected result format: {result}")
+def build_enhanced_prompt(prompt, industry, design_style, tone):
+    # the enhanced prompt is only used for generation; the DB keeps the original values
+    return (
+        f"{prompt}. Industry: {industry}. Style: {design_style}. Tone: {tone}. "
+        "Enhance the details, focus on clarity of any text, Use only ENGLISH language without grammer mistake"
+    )
 
-        return True
 
+def generate_poster_image(prompt):
+    """Render `prompt` with the configured backend; returns (RenderedImage, timings)."""
+    try:
+        return get_poster_backend().generate(prompt)
     except Exception as e:
         raise RuntimeError(f"Poster generation failed: {e}")
 
 
-import requests
+_graph_session = None
+_graph_session_lock = threading.Lock()
+
+
+def get_graph_session():
+    """Process-wide keep-alive session for the Graph API, shared by the publishing threads."""
+    global _graph_session
+    with _graph_session_lock:
+        if _graph_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=settings.SOCIAL_GRAPH["POOL_SIZE"])
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _graph_session = session
+        return _graph_session
+
+
+def graph_post(path, payload):
+    options = settings.SOCIAL_GRAPH
+    url = f"{options['URL'].rstrip('/')}/{path}"
+    return get_graph_session().post(url, data=payload, timeout=(options["CONNECT_TIMEOUT"], options["TIMEOUT"]))
+
 
 def post_to_facebook(access_token, page_id, image_url, caption):
-    fb_url = f"https://graph.facebook.com/v17.0/{page_id}/photos"
     payload = {
         "url": image_url,
         "caption": caption,
         "access_token": access_token
     }
     try:
-        response = requests.post(fb_url, data=payload)
+        response = graph_post(f"{page_id}/photos", payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        return {"error": str(e)}
+        error = {"error": str(e)}
+        # keep Graph's error body (code, subcode) so callers can spot rate limiting
+        if e.response is not None:
+            try:
+                error["details"] = e.response.json()
+            except ValueError:
+                pass
+        return error
+
 
-    
 def post_to_instagram(access_token, instagram_id, image_url, caption):
     # Step 1: Create Media Container
-    ig_create_url = f"https://graph.facebook.com/v17.0/{instagram_id}/media"
     payload_create = {
         "image_url": image_url,
         "caption": caption,
         "access_token": access_token
     }
-    res_create = requests.post(ig_create_url, data=payload_create).json()
+    try:
+        res_create = graph_post(f"{instagram_id}/media", payload_create).json()
+    except requests.exceptions.RequestException as e:
+        return {"error": "Failed to create Instagram media container", "details": str(e)}
 
     if "id" not in res_create:
         return {
@@ -69,12 +90,14 @@ def post_to_instagram(access_token, instagram_id, image_url, caption):
     creation_id = res_create["id"]
 
     # Step 2: Publish Media
-    ig_publish_url = f"https://graph.facebook.com/v17.0/{instagram_id}/media_publish"
     payload_publish = {
         "creation_id": creation_id,
         "access_token": access_token
     }
-    res_publish = requests.post(ig_publish_url, data=payload_publish).json()
+    try:
+        res_publish = graph_post(f"{instagram_id}/media_publish", payload_publish).json()
+    except requests.exceptions.RequestException as e:
+        return {"error": "Failed to publish Instagram post", "details": str(e)}
 
     if "id" not in res_publish:
         return {
@@ -82,4 +105,43 @@ def post_to_instagram(access_token, instagram_id, image_url, caption):
             "details": res_publish  # 👈 also log publish error
         }
 
-    return res_publish
\ No newline at end of file
+    return res_publish
+
+
+def _timed(publish, **kwargs):
+    started = time.monotonic()
+    result = publish(**kwargs)
+    return {**result, "elapsed": round(time.monotonic() - started, 3)}
+
+
+def publish_to_platforms(account, platforms, image_url, caption):
+    """
+    Publish to each requested platform, concurrently when there is more than one,
+    and return {platform: Graph API result plus "elapsed" seconds}.
+    """
+    results = {}
+    calls = {}
+    if "facebook" in platforms:
+        if not account.fb_page_id:
+            results["facebook"] = {"error": "Missing fb_page_id in your SocialAccount."}
+        else:
+            calls["facebook"] = (post_to_facebook, {"page_id": account.fb_page_id})
+    if "instagram" in platforms:
+        if not account.instagram_id:
+            results["instagram"] = {"error": "Missing instagram_id in your SocialAccount."}
+        else:
+            calls["instagram"] = (post_to_instagram, {"instagram_id": account.instagram_id})
+
+    common = {"access_token": account.access_token, "image_url": image_url, "caption": caption}
+    if len(calls) == 1:
+        [(platform, (publish, kwargs))] = calls.items()
+        results[platform] = _timed(publish, **common, **kwargs)
+    elif calls:
+        with ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="social-post") as pool:
+            futures = {
+                platform: pool.submit(_timed, publish, **common, **kwargs)
+                for platform, (publish, kwargs) in calls.items()
+            }
+        for platform, future in futures.items():
+            results[platform] = future.result()
+    return results
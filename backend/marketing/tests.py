@@ -1,3 +1,780 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .backends import GradioBackend, GradioClientPool, PosterBackend, PoolTimeout, RenderedImage
+from . import dispatcher, jobs, uploader
+from .cache import PromptCache, get_prompt_cache
+from .derivatives import dhash
+from .models import Poster, PosterJob, ScheduledPost, SocialAccount
+from .serializers import PosterSerializer
+
+def png_bytes(size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.linear_gradient("L").resize(size).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+PNG_BYTES = png_bytes()
+fake_prompts = []
+
+
+def write_temp_png():
+    fd, path = tempfile.mkstemp(suffix=".png")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(PNG_BYTES)
+    return path
+
+
+class FakeBackend(PosterBackend):
+    """Stand-in for the Gradio backend: records the prompt and leaves a tiny PNG in a temp file."""
+    lock = threading.Lock()
+    inflight = max_inflight = 0
+    rendered = []
+
+    def generate(self, prompt):
+        if "explode" in prompt:
+            raise RuntimeError("backend unavailable")
+        with self.lock:
+            fake_prompts.append(prompt)
+            FakeBackend.inflight += 1
+            FakeBackend.max_inflight = max(FakeBackend.max_inflight, FakeBackend.inflight)
+        if "slow" in prompt:
+            time.sleep(0.1)
+        with self.lock:
+            FakeBackend.inflight -= 1
+        rendered = RenderedImage(write_temp_png(), temporary=True)
+        with self.lock:
+            FakeBackend.rendered.append(rendered.location)
+        return rendered, {"predict": 0.0}
+
+
+class FakeGeneratorMixin:
+    """Runs poster jobs inline against FakeBackend with a throwaway MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            POSTER_BACKEND="marketing.tests.FakeBackend",
+            POSTER_JOBS_EAGER=True,
+            POSTER_UPLOAD={"WORKERS": 1, "RETRIES": 3, "BACKOFF": 0, "CHUNK_SIZE": 1024, "STALE_AFTER": 300},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        upload = mock.patch("marketing.uploader.upload_to_cloudinary", return_value="https://cdn.example.com/p.png")
+        self.upload = upload.start()
+        self.addCleanup(upload.stop)
+        fake_prompts.clear()
+        FakeBackend.max_inflight = 0
+        FakeBackend.rendered = []
+        get_prompt_cache().clear()
+
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class PosterListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_newest_first(self):
+        posters = [Poster.objects.create(user=self.user, prompt=f"p{i}") for i in range(5)]
+
+        first = self.client.get("/api/marketing/all/", {"limit": 3}).data
+        second = self.client.get("/api/marketing/all/", {"limit": 3, "cursor": first["next_cursor"]}).data
+
+        ids = [p["id"] for p in first["results"] + second["results"]]
+        self.assertEqual(ids, [p.id for p in reversed(posters)])
+        self.assertIsNone(second["next"])
+
+
+class PosterJobTests(FakeGeneratorMixin, TestCase):
+    def create(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/marketing/add/", {"industry": "Retail", **data}, format="json")
+
+    def test_returns_job_and_generates_poster(self):
+        response = self.create(prompt="Summer sale", caption="Hot deals")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "queued")
+
+        job = self.client.get(f"/api/marketing/jobs/{response.data['id']}/").data
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["poster"]["prompt"], "Summer sale")
+        self.assertEqual(job["poster"]["caption"], "Hot deals")
+        self.assertIn("Industry: Retail", fake_prompts[0])
+        poster = Poster.objects.get()
+        self.assertTrue(os.path.exists(poster.image.path))
+        self.assertEqual(poster.thumbnail.name, poster.image.name.replace(".png", ".thumbnail.webp"))
+        self.assertEqual(len(poster.phash), 16)
+
+        listed = self.client.get("/api/marketing/all/").data[0]
+        self.assertNotIn("image", listed)
+        self.assertTrue(listed["thumbnail"].endswith(".thumbnail.webp"))
+        self.assertTrue(listed["medium"].endswith(".medium.webp"))
+
+    def test_generation_failure_is_reported(self):
+        with self.assertLogs("marketing.jobs", "ERROR"):
+            response = self.create(prompt="explode")
+        job = PosterJob.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, PosterJob.FAILED)
+        self.assertIn("backend unavailable", job.error)
+        self.assertFalse(Poster.objects.exists())
+
+    def test_prompt_is_required(self):
+        self.assertEqual(self.create(prompt=" ").status_code, 400)
+
+    def test_repeated_prompt_reuses_render(self):
+        first = self.create(prompt="Summer sale", tone="Bold")
+        second = self.create(prompt="  Summer   sale ", tone="Bold")
+
+        self.assertEqual(len(fake_prompts), 1)
+        self.assertEqual(self.upload.call_count, 1)
+        self.assertTrue(PosterJob.objects.get(pk=second.data["id"]).from_cache)
+        posters = list(Poster.objects.order_by("id"))
+        self.assertEqual(posters[0].image.name, posters[1].image.name)
+        self.assertEqual(posters[1].public_url, "https://cdn.example.com/p.png")
+
+        # deleting one poster must not remove the file the other still uses
+        self.client.delete(f"/api/marketing/delete/{posters[0].pk}/")
+        self.assertTrue(os.path.exists(posters[1].image.path))
+        self.assertFalse(PosterJob.objects.get(pk=first.data["id"]).from_cache)
+
+    def test_cache_respects_case_and_tenant(self):
+        self.create(prompt="Summer sale")
+        self.create(prompt="SUMMER SALE")  # the model renders the text as written
+
+        self.client.force_authenticate(User.objects.create_user("other"))
+        other = self.create(prompt="Summer sale")
+
+        self.assertEqual(len(fake_prompts), 3)
+        self.assertFalse(PosterJob.objects.get(pk=other.data["id"]).from_cache)
+        images = set(Poster.objects.values_list("image", flat=True))
+        self.assertEqual(len(images), 3)
+
+    def test_cache_opt_out(self):
+        self.create(prompt="Summer sale")
+        self.create(prompt="Summer sale", use_cache="false")
+        self.assertEqual(len(fake_prompts), 2)
+
+    def test_stranded_jobs_are_requeued(self):
+        old = timezone.now() - timedelta(seconds=settings.POSTER_JOB_STALE_AFTER + 60)
+        stranded = PosterJob.objects.create(user=self.user, prompt="Queued before a restart")
+        interrupted = PosterJob.objects.create(user=self.user, prompt="Running during a restart")
+        PosterJob.objects.filter(pk=stranded.pk).update(created_at=old)
+        PosterJob.objects.filter(pk=interrupted.pk).update(created_at=old, status=PosterJob.RUNNING, started_at=old)
+        fresh = PosterJob.objects.create(user=self.user, prompt="Just queued")
+
+        with self.assertLogs("marketing.jobs", "WARNING"):
+            self.assertEqual(jobs.recover_jobs(), 2)
+
+        for job in (stranded, interrupted):
+            job.refresh_from_db()
+            self.assertEqual(job.status, PosterJob.SUCCEEDED)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, PosterJob.QUEUED)
+
+    def test_jobs_are_private(self):
+        job = PosterJob.objects.create(user=User.objects.create_user("other"), prompt="x")
+        self.assertEqual(self.client.get(f"/api/marketing/jobs/{job.pk}/").status_code, 404)
+
+
+class PosterUploadTests(FakeGeneratorMixin, TestCase):
+    def make_poster(self, prompt="Launch"):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/marketing/add/", {"prompt": prompt}, format="json")
+        return PosterJob.objects.get(pk=response.data["id"]).poster
+
+    def test_save_never_uploads(self):
+        Poster.objects.create(user=self.user, prompt="admin edit", image="generated_posters/x.png")
+        self.upload.assert_not_called()
+
+    def test_generated_poster_uploads_in_background(self):
+        poster = self.make_poster()
+        self.assertEqual(poster.upload_status, Poster.UPLOAD_UPLOADED)
+        self.assertEqual(poster.public_url, "https://cdn.example.com/p.png")
+
+    def test_render_is_moved_into_storage_and_uploaded_from_it(self):
+        poster = self.make_poster()
+        self.assertFalse(os.path.exists(FakeBackend.rendered[0]))  # moved, not copied
+        with poster.image.open("rb") as fh:
+            self.assertEqual(fh.read(), PNG_BYTES)
+        uploaded = self.upload.call_args.args[0]
+        self.assertEqual(uploaded.name, poster.image.name)
+        self.assertEqual(self.upload.call_args.kwargs, {"chunk_size": 1024})
+
+    @override_settings(POSTER_PERSIST_LOCAL=False)
+    def test_skip_local_persistence(self):
+        poster = self.make_poster()
+        self.assertFalse(poster.image)
+        self.assertEqual(poster.upload_status, Poster.UPLOAD_UPLOADED)
+        self.assertEqual(self.upload.call_args.args[0], FakeBackend.rendered[0])
+        self.assertFalse(os.path.exists(FakeBackend.rendered[0]))
+        self.assertFalse(default_storage.exists("generated_posters"))
+        self.assertEqual(PosterSerializer(poster).data["image"], "https://cdn.example.com/p.png")
+
+    @override_settings(POSTER_PERSIST_LOCAL=False)
+    def test_skip_local_persistence_failure_fails_job(self):
+        self.upload.side_effect = Exception("quota")
+        with self.assertLogs("marketing.uploader", "WARNING"), self.assertLogs("marketing.jobs", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post("/api/marketing/add/", {"prompt": "Launch"}, format="json")
+        job = PosterJob.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, PosterJob.FAILED)
+        self.assertIn("quota", job.error)
+
+    def test_retries_then_marks_failed(self):
+        self.upload.side_effect = [Exception("timeout"), "https://cdn.example.com/retry.png"]
+        with self.assertLogs("marketing.uploader", "WARNING"):
+            poster = self.make_poster()
+        self.assertEqual(poster.public_url, "https://cdn.example.com/retry.png")
+
+        self.upload.side_effect = Exception("Cloudinary upload failed: quota")
+        with self.assertLogs("marketing.uploader", "WARNING"):
+            poster = self.make_poster("Another")
+        self.assertEqual(poster.upload_status, Poster.UPLOAD_FAILED)
+        self.assertIn("quota", poster.upload_error)
+
+    def test_social_post_reports_upload_state(self):
+        SocialAccount.objects.create(user=self.user, access_token="t", fb_page_id="1")
+        poster = Poster.objects.create(user=self.user, prompt="x", image="generated_posters/x.png")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/marketing/social/post/{poster.pk}/", {"platforms": "facebook"}, format="json"
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["upload_status"], "pending")
+        self.upload.assert_not_called()  # still fresh: an upload may be in flight
+
+        # pending past STALE_AFTER means no worker holds it any more
+        Poster.objects.filter(pk=poster.pk).update(created_at=timezone.now() - timedelta(minutes=10))
+        default_storage.save(poster.image.name, ContentFile(PNG_BYTES))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/marketing/social/post/{poster.pk}/", {"platforms": "facebook"}, format="json")
+        poster.refresh_from_db()
+        self.assertEqual(poster.upload_status, Poster.UPLOAD_UPLOADED)
+
+    def test_stalled_pending_uploads_are_recovered(self):
+        name = default_storage.save("generated_posters/stalled.png", ContentFile(PNG_BYTES))
+        stalled = Poster.objects.create(user=self.user, prompt="restart", image=name)
+        Poster.objects.filter(pk=stalled.pk).update(created_at=timezone.now() - timedelta(minutes=10))
+        fresh = Poster.objects.create(user=self.user, prompt="in flight", image=name)
+        Poster.objects.create(user=self.user, prompt="batch row, not rendered yet")
+
+        with self.captureOnCommitCallbacks(execute=True), self.assertLogs("marketing.uploader", "WARNING"):
+            self.assertEqual(uploader.recover_uploads(), 1)
+
+        stalled.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stalled.upload_status, Poster.UPLOAD_UPLOADED)
+        self.assertEqual(fresh.upload_status, Poster.UPLOAD_PENDING)
+
+
+@override_settings(POSTER_BATCH_PARALLELISM=3)
+class PosterBatchTests(FakeGeneratorMixin, TestCase):
+    url = "/api/marketing/batch/"
+
+    def post(self, variants, **extra):
+        response = self.client.post(self.url, {"variants": variants, **extra}, format="json")
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        return response, lines
+
+    def test_streams_each_variant(self):
+        variants = [{"prompt": f"slow variant {i}", "tone": "Bold"} for i in range(6)] + [{"prompt": "explode"}]
+        with CaptureQueriesContext(connection) as queries, self.assertLogs("marketing.jobs", "WARNING"):
+            response, lines = self.post(variants, parallelism=10)
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(lines[-1], {"done": True, "succeeded": 6, "failed": 1})
+        results = {line["index"]: line for line in lines[:-1]}
+        self.assertEqual(results[6]["status"], "failed")
+        self.assertEqual(results[2]["poster"]["prompt"], "slow variant 2")
+
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "marketing_poster"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(FakeBackend.max_inflight, 3)  # capped by POSTER_BATCH_PARALLELISM
+        self.assertEqual(Poster.objects.filter(user=self.user).exclude(image="").count(), 6)
+        self.assertEqual(Poster.objects.count(), 6)
+
+    def test_rejects_variant_without_prompt(self):
+        response = self.client.post(self.url, {"variants": [{"prompt": "ok"}, {"tone": "Bold"}]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data["errors"]), [1])
+        self.assertFalse(Poster.objects.exists())
+
+
+class PosterDerivativeTests(FakeGeneratorMixin, TestCase):
+    def store_png(self, name, size=(1600, 900)):
+        return default_storage.save(name, ContentFile(png_bytes(size)))
+
+    def test_backfill_is_idempotent(self):
+        name = self.store_png("generated_posters/legacy.png")
+        shared = [Poster.objects.create(user=self.user, prompt="old", image=name) for _ in range(2)]
+        Poster.objects.create(user=self.user, prompt="gone", image="generated_posters/missing.png")
+
+        out = io.StringIO()
+        call_command("build_poster_derivatives", stdout=out, stderr=io.StringIO())
+        self.assertIn("Processed 1 image(s); 1 missing", out.getvalue())
+        for poster in shared:
+            poster.refresh_from_db()
+            self.assertEqual(poster.medium.name, "generated_posters/legacy.medium.webp")
+        with default_storage.open(poster.thumbnail.name, "rb") as fh:
+            self.assertEqual(Image.open(fh).size, (320, 180))
+
+        call_command("build_poster_derivatives", stdout=out, stderr=io.StringIO())
+        self.assertIn("Processed 0 image(s)", out.getvalue())
+        self.assertEqual(len(default_storage.listdir("generated_posters")[1]), 3)
+
+    def test_dhash_tracks_visual_similarity(self):
+        gradient = Image.linear_gradient("L").resize((64, 64))
+        self.assertEqual(dhash(gradient), dhash(gradient.resize((300, 300))))
+        self.assertNotEqual(dhash(gradient.rotate(90)), dhash(gradient.rotate(270)))
+
+
+class FakeGraphAPI(BaseHTTPRequestHandler):
+    """Local Graph API: every call takes `delay` seconds; tracks concurrency and connections."""
+    protocol_version = "HTTP/1.1"
+    delay = 0.1
+    calls = []
+    inflight = max_inflight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        with self.lock:
+            FakeGraphAPI.calls.append((self.path, self.client_address[1], body))
+            FakeGraphAPI.inflight += 1
+            FakeGraphAPI.max_inflight = max(FakeGraphAPI.max_inflight, FakeGraphAPI.inflight)
+        time.sleep(self.delay)
+        with self.lock:
+            FakeGraphAPI.inflight -= 1
+
+        if "/throttled/" in self.path:
+            status, payload = 400, {"error": {"message": "Too many calls", "code": 32}}
+        elif "/broken/" in self.path:
+            status, payload = 500, {"error": {"message": "Unknown error", "code": 1}}
+        elif self.path.endswith("/photos"):
+            status, payload = 200, {"id": "fb-1", "post_id": "page_fb-1"}
+        elif self.path.endswith("/media") and "bad-image" in body:
+            status, payload = 400, {"error": {"message": "Invalid image"}}
+        elif self.path.endswith("/media"):
+            status, payload = 200, {"id": "container-1"}
+        else:
+            status, payload = 200, {"id": "ig-1"}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        try:
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeGraphMixin:
+    """Points SOCIAL_GRAPH at a FakeGraphAPI server and sets up an owner with an account."""
+
+    def setUp(self):
+        super().setUp()
+        FakeGraphAPI.calls = []
+        FakeGraphAPI.max_inflight = 0
+        FakeGraphAPI.delay = 0.1
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGraphAPI)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        settings_override = override_settings(SOCIAL_GRAPH={
+            "URL": f"http://127.0.0.1:{server.server_port}/v17.0",
+            "CONNECT_TIMEOUT": 1, "TIMEOUT": 0.5, "POOL_SIZE": 4,
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        SocialAccount.objects.create(user=self.user, access_token="t", fb_page_id="page", instagram_id="ig")
+        self.poster = Poster.objects.create(
+            user=self.user, prompt="x", public_url="https://cdn.example.com/p.png",
+            upload_status=Poster.UPLOAD_UPLOADED,
+        )
+
+
+class SocialPublishTests(FakeGraphMixin, TestCase):
+    def publish(self, platforms="both"):
+        return self.client.post(
+            f"/api/marketing/social/post/{self.poster.pk}/", {"platforms": platforms, "caption": "Hi"}, format="json"
+        )
+
+    def test_publishes_platforms_concurrently(self):
+        response = self.publish()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["facebook"]["id"], "fb-1")
+        self.assertEqual(response.data["instagram"]["id"], "ig-1")
+        self.assertGreaterEqual(response.data["instagram"]["elapsed"], 0.2)  # two sequential calls
+        self.assertGreaterEqual(response.data["facebook"]["elapsed"], 0.1)
+        self.assertEqual(FakeGraphAPI.max_inflight, 2)
+
+        paths = [path for path, _, _ in FakeGraphAPI.calls]
+        self.assertEqual(sorted(paths), ["/v17.0/ig/media", "/v17.0/ig/media_publish", "/v17.0/page/photos"])
+        # three calls over at most two keep-alive connections, one per concurrent platform
+        self.assertLessEqual(len({port for _, port, _ in FakeGraphAPI.calls}), 2)
+
+    def test_reports_container_errors(self):
+        self.poster.public_url = "https://cdn.example.com/bad-image.png"
+        self.poster.save()
+        response = self.publish("instagram")
+        self.assertEqual(response.data["instagram"]["error"], "Failed to create Instagram media container")
+        self.assertEqual(response.data["instagram"]["details"], {"error": {"message": "Invalid image"}})
+        self.assertNotIn("facebook", response.data)
+
+    def test_calls_time_out(self):
+        FakeGraphAPI.delay = 1
+        response = self.publish("facebook")
+        self.assertIn("timed out", response.data["facebook"]["error"])
+        self.assertLess(response.data["facebook"]["elapsed"], 1)
+
+
+@override_settings(SOCIAL_DISPATCH={
+    "INTERVAL": 30, "BATCH_SIZE": 50, "WORKERS": 4, "RATE_PER_HOUR": 3600, "BURST": 10,
+    "MAX_ATTEMPTS": 2, "BACKOFF": 60, "MAX_BACKOFF": 600, "STALE_AFTER": 600,
+})
+class ScheduledPostTests(FakeGraphMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        dispatcher._buckets.clear()
+
+    def schedule(self, user, platform, publish_at=None, poster=None):
+        poster = poster or Poster.objects.create(user=user, prompt="x", public_url="https://cdn.example.com/p.png")
+        publish_at = publish_at or timezone.now()
+        return ScheduledPost.objects.create(
+            user=user, poster=poster, platform=platform, publish_at=publish_at, due_at=publish_at
+        )
+
+    def account(self, name, **ids):
+        user = User.objects.create_user(username=name)
+        SocialAccount.objects.create(user=user, access_token=f"token-{name}", **ids)
+        return user
+
+    def test_schedule_endpoint(self):
+        other = Poster.objects.create(user=self.user, prompt="y", caption="Saved caption")
+        publish_at = (timezone.now() + timedelta(hours=1)).isoformat()
+        response = self.client.post("/api/marketing/social/scheduled/", {
+            "posters": [self.poster.pk, other.pk], "platforms": "both", "publish_at": publish_at,
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(ScheduledPost.objects.get(poster=other, platform="instagram").caption, "Saved caption")
+
+        stranger = Poster.objects.create(user=User.objects.create_user("stranger"), prompt="z")
+        response = self.client.post(
+            "/api/marketing/social/scheduled/", {"posters": [stranger.pk], "platforms": "facebook"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        for posters in ("12", str(self.poster.pk), [], ["x"]):
+            response = self.client.post(
+                "/api/marketing/social/scheduled/", {"posters": posters, "platforms": "facebook"}, format="json"
+            )
+            self.assertEqual(response.status_code, 400, posters)
+        self.assertEqual(ScheduledPost.objects.count(), 4)
+
+        post = ScheduledPost.objects.first()
+        self.assertEqual(self.client.delete(f"/api/marketing/social/scheduled/{post.pk}/").status_code, 204)
+        self.assertEqual(self.client.delete(f"/api/marketing/social/scheduled/{post.pk}/").status_code, 409)
+
+    def test_publishes_accounts_in_parallel(self):
+        posts = [self.schedule(self.user, "instagram")]
+        for i in range(3):
+            posts.append(self.schedule(self.account(f"acct{i}", fb_page_id=f"page{i}"), "facebook"))
+        later = self.schedule(self.user, "facebook", publish_at=timezone.now() + timedelta(hours=1))
+
+        with self.assertLogs("marketing.dispatcher", "INFO"):
+            stats = dispatcher.dispatch_due_posts()
+        self.assertEqual((stats["claimed"], stats["published"]), (4, 4))
+        self.assertGreater(FakeGraphAPI.max_inflight, 1)
+        for post in posts:
+            post.refresh_from_db()
+            self.assertEqual(post.status, ScheduledPost.PUBLISHED)
+            self.assertIn("id", post.result)
+        later.refresh_from_db()
+        self.assertEqual(later.status, ScheduledPost.SCHEDULED)
+
+    def test_token_bucket_defers_extra_posts(self):
+        FakeGraphAPI.delay = 0
+        with self.settings(SOCIAL_DISPATCH={**settings.SOCIAL_DISPATCH, "BURST": 3, "RATE_PER_HOUR": 1}):
+            posts = [self.schedule(self.user, "facebook") for _ in range(2)] + [self.schedule(self.user, "instagram")]
+            with self.assertLogs("marketing.dispatcher", "INFO"):
+                stats = dispatcher.dispatch_due_posts()
+        self.assertEqual((stats["published"], stats["deferred"]), (2, 1))
+        posts[2].refresh_from_db()
+        self.assertEqual((posts[2].status, posts[2].attempts), (ScheduledPost.SCHEDULED, 0))
+        # one token left, two needed, at one per hour
+        delay = (posts[2].due_at - timezone.now()).total_seconds()
+        self.assertTrue(3500 < delay <= 3600, delay)
+
+    def test_throttled_account_does_not_starve_others(self):
+        FakeGraphAPI.delay = 0
+        options = {**settings.SOCIAL_DISPATCH, "BATCH_SIZE": 20, "BURST": 2, "RATE_PER_HOUR": 60}
+        with self.settings(SOCIAL_DISPATCH=options):
+            backlog = [self.schedule(self.user, "facebook") for _ in range(30)]
+            # due after the whole backlog, so the first batch is all the throttled account's
+            other = self.schedule(self.account("quiet", fb_page_id="quiet-page"), "facebook")
+            with self.assertLogs("marketing.dispatcher", "INFO"):
+                first = dispatcher.dispatch_due_posts()
+                second = dispatcher.dispatch_due_posts()
+
+        self.assertEqual((first["claimed"], first["published"], first["deferred"]), (20, 2, 18))
+        # the deferred posts now wait for their tokens, so the rest of the queue moves up
+        other.refresh_from_db()
+        self.assertEqual(other.status, ScheduledPost.PUBLISHED)
+        self.assertEqual(second["published"], 1)
+        due = sorted(ScheduledPost.objects.filter(pk__in=[p.pk for p in backlog[2:20]]).values_list("due_at", flat=True))
+        self.assertGreater(due[0], timezone.now() + timedelta(seconds=50))
+        self.assertGreater(due[-1], due[0])
+
+    def test_waits_for_pending_uploads_without_spending_attempts(self):
+        FakeGraphAPI.delay = 0
+        poster = Poster.objects.create(user=self.user, prompt="still uploading")
+        post = self.schedule(self.user, "facebook", poster=poster)
+
+        with self.assertLogs("marketing.dispatcher", "INFO"):
+            stats = dispatcher.dispatch_due_posts()
+        self.assertEqual((stats["deferred"], stats["retried"]), (1, 0))
+        post.refresh_from_db()
+        self.assertEqual((post.status, post.attempts), (ScheduledPost.SCHEDULED, 0))
+        self.assertGreater(post.due_at, timezone.now())
+
+    def test_retries_with_backoff_then_fails(self):
+        FakeGraphAPI.delay = 0
+        user = self.account("flaky", fb_page_id="broken")
+        post = self.schedule(user, "facebook")
+
+        with self.assertLogs("marketing.dispatcher", "INFO"):
+            dispatcher.dispatch_due_posts()
+        post.refresh_from_db()
+        self.assertEqual((post.status, post.attempts), (ScheduledPost.SCHEDULED, 1))
+        delay = (post.due_at - timezone.now()).total_seconds()
+        self.assertTrue(25 < delay <= 60, delay)
+
+        ScheduledPost.objects.filter(pk=post.pk).update(due_at=timezone.now())
+        with self.assertLogs("marketing.dispatcher", "INFO"):
+            dispatcher.dispatch_due_posts()
+        post.refresh_from_db()
+        self.assertEqual((post.status, post.attempts), (ScheduledPost.FAILED, 2))
+        self.assertIn("500", post.error)
+
+    def test_rate_limit_response_drains_bucket(self):
+        FakeGraphAPI.delay = 0
+        user = self.account("busy", fb_page_id="throttled")
+        self.schedule(user, "facebook")
+        self.schedule(user, "facebook")
+        with self.assertLogs("marketing.dispatcher", "INFO"):
+            stats = dispatcher.dispatch_due_posts()
+        self.assertEqual((stats["retried"], stats["deferred"]), (1, 1))
+        self.assertEqual(len(FakeGraphAPI.calls), 1)
+
+    def test_token_bucket_refills(self):
+        bucket = dispatcher.TokenBucket(rate=1000, capacity=2)
+        self.assertTrue(bucket.take(2))
+        self.assertFalse(bucket.take(2))
+        time.sleep(0.01)
+        self.assertTrue(bucket.take(2))
+
+
+class FakeGradioClient:
+    instances = 0
+
+    def __init__(self, space_id, fail_times=0, result=None):
+        FakeGradioClient.instances += 1
+        self.fail_times = fail_times
+        self.result = result
+
+    def predict(self, prompt, api_name):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("space restarted")
+        return self.result
+
+
+class GradioBackendTests(TestCase):
+    def setUp(self):
+        FakeGradioClient.instances = 0
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.source = os.path.join(self.tmp, "result.png")
+        with open(self.source, "wb") as fh:
+            fh.write(PNG_BYTES)
+
+    def test_reuses_client_across_generations(self):
+        backend = GradioBackend(client_factory=lambda space: FakeGradioClient(space, result=self.source))
+        for i in range(3):
+            rendered, timings = backend.generate("prompt")
+        self.assertEqual(FakeGradioClient.instances, 1)
+        self.assertEqual(set(timings), {"connect", "predict"})
+        self.assertEqual(rendered.location, self.source)
+        self.assertTrue(rendered.temporary)
+
+    def test_reconnects_after_failure(self):
+        clients = iter([FakeGradioClient("s", fail_times=1), FakeGradioClient("s", result=[self.source])])
+        backend = GradioBackend(client_factory=lambda space: next(clients))
+        with self.assertLogs("marketing.backends", "WARNING"):
+            backend.generate("prompt")
+        self.assertEqual(backend.pool._created, 1)
+
+    def test_pool_recycles_stale_clients(self):
+        pool = GradioClientPool("space", size=1, max_age=0, client_factory=lambda space: FakeGradioClient(space))
+        with pool.client():
+            pass
+        with pool.client():
+            pass
+        self.assertEqual(FakeGradioClient.instances, 2)
+
+    def test_idle_clients_are_pinged_before_reuse(self):
+        pings = []
+        pool = GradioClientPool(
+            "space", size=1, client_factory=lambda space: FakeGradioClient(space),
+            ping=lambda client: pings.append(client) or len(pings) > 1, ping_after=0,
+        )
+        with pool.client() as first:
+            pass
+        with self.assertLogs("marketing.backends", "INFO"), pool.client() as second:
+            pass  # the first ping fails: a fresh client is connected
+        with pool.client() as third:
+            pass  # the second succeeds: it is reused
+
+        self.assertEqual(pings, [first, second])
+        self.assertIsNot(second, first)
+        self.assertIs(third, second)
+        self.assertEqual((FakeGradioClient.instances, pool._created), (2, 1))
+
+    def test_recently_used_clients_skip_the_ping(self):
+        pool = GradioClientPool(
+            "space", size=1, client_factory=lambda space: FakeGradioClient(space),
+            ping=lambda client: self.fail("pinged"), ping_after=60,
+        )
+        for _ in range(3):
+            with pool.client():
+                pass
+        self.assertEqual(FakeGradioClient.instances, 1)
+
+    def test_waiting_checkout_wakes_when_a_busy_client_fails(self):
+        pool = GradioClientPool("space", size=1, client_factory=lambda space: FakeGradioClient(space))
+        checked_out, release = threading.Event(), threading.Event()
+        results = []
+
+        def failing():
+            with self.assertRaises(ConnectionError), pool.client():
+                checked_out.set()
+                release.wait(5)
+                raise ConnectionError("space restarted")
+
+        def waiting():
+            checked_out.wait(5)
+            with pool.client(timeout=5) as client:
+                results.append(client)
+
+        threads = [threading.Thread(target=failing), threading.Thread(target=waiting)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(pool._created, 1)
+
+    def test_checkout_times_out_when_every_client_is_busy(self):
+        pool = GradioClientPool("space", size=1, client_factory=lambda space: FakeGradioClient(space))
+        with pool.client():
+            with self.assertRaises(PoolTimeout):
+                with pool.client(timeout=0.05):
+                    pass
+
+
+class PNGHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(PNG_BYTES)))
+        self.end_headers()
+        self.wfile.write(PNG_BYTES)
+
+    def log_message(self, *args):
+        pass
+
+
+class RenderedImageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_streams_remote_render_into_storage(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), PNGHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        rendered = RenderedImage(f"http://127.0.0.1:{server.server_port}/image.png")
+        with rendered.open() as content:
+            name = default_storage.save("generated_posters/remote.png", content)
+        with default_storage.open(name, "rb") as fh:
+            self.assertEqual(fh.read(), PNG_BYTES)
+
+    def test_local_file_is_only_discarded_when_temporary(self):
+        kept, dropped = RenderedImage(write_temp_png()), RenderedImage(write_temp_png(), temporary=True)
+        self.addCleanup(os.remove, kept.location)
+        kept.discard()
+        dropped.discard()
+        self.assertTrue(os.path.exists(kept.location))
+        self.assertFalse(os.path.exists(dropped.location))
+
+
+class PromptCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = PromptCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    def test_entries_expire(self):
+        cache = PromptCache(ttl=-1)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
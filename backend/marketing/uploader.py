@@ -0,0 +1,133 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Poster
+from .utils import upload_to_cloudinary
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_inflight = set()
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POSTER_UPLOAD["WORKERS"], thread_name_prefix="poster-upload"
+            )
+        return _executor
+
+
+def enqueue_upload(poster_id):
+    """Upload the poster's image in the background once the current transaction commits."""
+    def submit():
+        with _lock:
+            if poster_id in _inflight:
+                return
+            _inflight.add(poster_id)
+        if settings.POSTER_JOBS_EAGER:
+            _run(poster_id)
+        else:
+            get_executor().submit(_run_in_worker, poster_id)
+
+    transaction.on_commit(submit)
+
+
+def needs_requeue(poster, now=None):
+    """
+    Whether nothing will upload this poster unless it is queued again: its upload
+    failed, or it has sat in "pending" past POSTER_UPLOAD["STALE_AFTER"] because the
+    process holding it exited or it was created outside the job pipeline.
+    """
+    if not poster.image or poster.upload_status == Poster.UPLOAD_UPLOADED:
+        return False
+    if poster.upload_status == Poster.UPLOAD_FAILED:
+        return True
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.POSTER_UPLOAD["STALE_AFTER"])
+    return poster.created_at is None or poster.created_at < cutoff
+
+
+def recover_uploads():
+    """Queue every poster stuck in "pending" for longer than STALE_AFTER again. Returns the count."""
+    cutoff = timezone.now() - timedelta(seconds=settings.POSTER_UPLOAD["STALE_AFTER"])
+    stale = list(
+        Poster.objects.filter(upload_status=Poster.UPLOAD_PENDING).exclude(image="").exclude(image=None)
+        .filter(Q(created_at__lt=cutoff) | Q(created_at=None)).values_list("pk", flat=True)
+    )
+    if stale:
+        logger.warning("Requeuing %d stalled poster upload(s)", len(stale))
+    for poster_id in stale:
+        enqueue_upload(poster_id)
+    return len(stale)
+
+
+def _run_in_worker(poster_id):
+    close_old_connections()
+    try:
+        _run(poster_id)
+    finally:
+        close_old_connections()
+
+
+def _run(poster_id):
+    try:
+        upload_poster(poster_id)
+    finally:
+        with _lock:
+            _inflight.discard(poster_id)
+
+
+def upload_poster(poster_id):
+    poster = Poster.objects.filter(pk=poster_id).first()
+    if poster is None or not poster.image or poster.upload_status == Poster.UPLOAD_UPLOADED:
+        return
+
+    # prompt-cache hits share an image file with a poster that may already be uploaded
+    shared_url = (
+        Poster.objects.filter(image=poster.image.name, upload_status=Poster.UPLOAD_UPLOADED)
+        .exclude(pk=poster.pk).values_list("public_url", flat=True).first()
+    )
+    if shared_url:
+        return _mark(poster, Poster.UPLOAD_UPLOADED, public_url=shared_url)
+
+    url, error = upload_with_retries(lambda: poster.image.open("rb"), f"poster {poster_id}")
+    if url:
+        return _mark(poster, Poster.UPLOAD_UPLOADED, public_url=url)
+    _mark(poster, Poster.UPLOAD_FAILED, error=error)
+
+
+def upload_with_retries(source, label):
+    """
+    Upload what source() returns (a path, URL or fresh file object per attempt),
+    retrying with backoff. Returns (url, None) or (None, last error).
+    """
+    options = settings.POSTER_UPLOAD
+    for attempt in range(1, options["RETRIES"] + 1):
+        try:
+            return upload_to_cloudinary(source(), chunk_size=options["CHUNK_SIZE"]), None
+        except Exception as e:
+            logger.warning("Upload of %s failed (attempt %d/%d): %s", label, attempt, options["RETRIES"], e)
+            error = str(e)
+            if attempt < options["RETRIES"]:
+                # exponential backoff with full jitter
+                time.sleep(random.uniform(0, options["BACKOFF"] * 2 ** (attempt - 1)))
+    return None, error
+
+
+def _mark(poster, upload_status, public_url=None, error=""):
+    fields = {"upload_status": upload_status, "upload_error": error}
+    if public_url:
+        fields["public_url"] = public_url
+    Poster.objects.filter(pk=poster.pk).update(**fields)
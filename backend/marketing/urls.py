@@ -1,10 +1,17 @@
 from django.urls import path
-from .views import PosterCreateView, PosterListView, PosterDeleteView,SocialAccountView,SocialPostView
+from .views import (
+    PosterBatchView, PosterCreateView, PosterJobView, PosterListView, PosterDeleteView, ScheduledPostCancelView,
+    ScheduledPostView, SocialAccountView, SocialPostView,
+)
 
 urlpatterns = [
-    path('add/', PosterCreateView.as_view()),        # POST
+    path('add/', PosterCreateView.as_view()),        # POST -> 202 + job
+    path('jobs/<int:pk>/', PosterJobView.as_view()), # GET job status (?wait=<s> to long-poll)
+    path('batch/', PosterBatchView.as_view()),       # POST variants -> NDJSON stream of results
     path('all/', PosterListView.as_view()),          # GET
     path('delete/<int:pk>/', PosterDeleteView.as_view()),  # DELETE
     path('social/account/', SocialAccountView.as_view()),   # GET, POST (save/update creds)
     path('social/post/<int:pk>/', SocialPostView.as_view()), # POST poster to FB/IG
+    path('social/scheduled/', ScheduledPostView.as_view()),  # GET, POST queue posters for later
+    path('social/scheduled/<int:pk>/', ScheduledPostCancelView.as_view()),  # DELETE cancel
 ]
\ No newline at end of file
@@ -2,20 +2,28 @@ import cloudinary
 import cloudinary.uploader
 from django.conf import settings
 
-def upload_to_cloudinary(image_path):
-    """
-    Uploads an image to Cloudinary and returns a secure, permanent URL.
-    """
+
+def configure_cloudinary():
+    """Apply the Cloudinary credentials once, at app startup."""
     cloudinary.config(
         cloud_name=settings.CLOUDINARY["cloud_name"],
         api_key=settings.CLOUDINARY["api_key"],
         api_secret=settings.CLOUDINARY["api_secret"]
     )
 
+
+def upload_to_cloudinary(image, chunk_size=6 * 1024 * 1024):
+    """
+    Uploads an image to Cloudinary and returns a secure, permanent URL.
+
+    `image` may be a local path, an open file or a remote URL. Files are sent in
+    chunk_size pieces so memory stays bounded; URLs are fetched by Cloudinary itself.
+    """
     try:
-        response = cloudinary.uploader.upload(
-            image_path,
-            resource_type="image"
+        response = cloudinary.uploader.upload_large(
+            image,
+            resource_type="image",
+            chunk_size=chunk_size,
         )
         return response.get("secure_url")  # always https:// link
 
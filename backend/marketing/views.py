@@ -1,15 +1,34 @@
-import os
-import uuid
+import json
+import time
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.permissions import IsAuthenticated
 
-from .services import post_to_facebook, post_to_instagram,generate_poster_image
-from .models import Poster,SocialAccount
-from .serializers import PosterSerializer,SocialAccountSerializer
+from backend.pagination import KeysetPagination
+
+from .jobs import enqueue, run_batch
+from .uploader import enqueue_upload, needs_requeue
+from .services import publish_to_platforms
+from .models import Poster, PosterJob, ScheduledPost, SocialAccount
+from .serializers import (
+    PosterJobSerializer, PosterListSerializer, PosterSerializer, ScheduledPostSerializer, SocialAccountSerializer,
+)
+
+
+def parse_platforms(platforms_in):
+    if isinstance(platforms_in, str):
+        return ["facebook", "instagram"] if platforms_in.lower() == "both" else [platforms_in.lower()]
+    if isinstance(platforms_in, list):
+        return [str(p).lower() for p in platforms_in]
+    return []
+
 
 class PosterCreateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -24,43 +43,110 @@ class PosterCreateView(APIView):
         if not original_prompt:
             return Response({"error": "Prompt is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Prepare enhanced prompt only for generation
-        enhanced_prompt = (
-            f"{original_prompt}. Industry: {industry}. Style: {design_style}. Tone: {tone}. "
-            "Enhance the details, focus on clarity of any text, Use only ENGLISH language without grammer mistake"
-        )
-
-        # Generate file path
-        filename = f"poster_{request.user.id}_{uuid.uuid4().hex}.png"
-        save_path = os.path.join(settings.MEDIA_ROOT, 'generated_posters', filename)
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        generate_poster_image(enhanced_prompt, save_path)
-
-        # Save only original prompt & dropdown values in DB
-        poster = Poster.objects.create(
+        # Generation takes tens of seconds, so it runs on the job pool instead of this request
+        job = PosterJob.objects.create(
             user=request.user,
             prompt=original_prompt,
             industry=industry,
             design_style=design_style,
             tone=tone,
-            image=f"generated_posters/{filename}",
             caption=request.data.get("caption", "").strip(),  # ✅ save caption if provided
+            # ?use_cache=false forces a fresh render even if this prompt was seen before
+            use_cache=str(request.data.get("use_cache", "true")).lower() not in ("false", "0", "no"),
         )
+        enqueue(job)
 
-        
         return Response(
-            PosterSerializer(poster, context={'request': request}).data,
-            status=status.HTTP_201_CREATED
+            PosterJobSerializer(job, context={'request': request}).data,
+            status=status.HTTP_202_ACCEPTED
         )
 
 
+class PosterJobView(APIView):
+    permission_classes = [IsAuthenticated]
+    # each waiting request holds a web worker, so long-polls stay short
+    max_wait = 5
+    poll_interval = 0.5
+
+    def get(self, request, pk):
+        job = get_object_or_404(PosterJob, pk=pk, user=request.user)
+
+        # ?wait=<seconds> long-polls until the job finishes or the wait runs out
+        try:
+            wait = min(float(request.query_params.get("wait", 0)), self.max_wait)
+        except ValueError:
+            wait = 0
+        deadline = time.monotonic() + wait
+        while not job.is_finished and time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            job.refresh_from_db()
+
+        return Response(PosterJobSerializer(job, context={'request': request}).data)
+
+
+class PosterBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        variants_in = request.data.get("variants")
+        if not isinstance(variants_in, list) or not variants_in:
+            return Response({"error": "variants must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(variants_in) > settings.POSTER_BATCH_MAX_VARIANTS:
+            return Response(
+                {"error": f"At most {settings.POSTER_BATCH_MAX_VARIANTS} variants per batch."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        variants, errors = [], {}
+        for index, item in enumerate(variants_in):
+            item = item if isinstance(item, dict) else {}
+            variant = {
+                field: str(item.get(field) or "").strip()
+                for field in ("prompt", "industry", "design_style", "tone", "caption")
+            }
+            if not variant["prompt"]:
+                errors[index] = "Prompt is required."
+            variants.append(variant)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            requested = int(request.data.get("parallelism") or settings.POSTER_BATCH_PARALLELISM)
+        except (TypeError, ValueError):
+            requested = settings.POSTER_BATCH_PARALLELISM
+        parallelism = max(1, min(requested, settings.POSTER_BATCH_PARALLELISM, len(variants)))
+        use_cache = str(request.data.get("use_cache", "true")).lower() not in ("false", "0", "no")
+
+        def stream():
+            # one JSON document per line, written as soon as each variant finishes
+            succeeded = 0
+            for index, poster, error in run_batch(request.user, variants, parallelism, use_cache):
+                if error:
+                    line = {"index": index, "status": "failed", "error": error}
+                else:
+                    succeeded += 1
+                    line = {
+                        "index": index,
+                        "status": "succeeded",
+                        "poster": PosterSerializer(poster, context={'request': request}).data,
+                    }
+                yield json.dumps(line, cls=DjangoJSONEncoder) + "\n"
+            yield json.dumps({"done": True, "succeeded": succeeded, "failed": len(variants) - succeeded}) + "\n"
+
+        return StreamingHttpResponse(stream(), content_type="application/x-ndjson")
+
+
 class PosterListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         posters = Poster.objects.filter(user=request.user).order_by('-created_at')
-        serializer = PosterSerializer(posters, many=True, context={'request': request})
+        paginator = KeysetPagination(descending=True)
+        page = paginator.paginate_queryset(posters, request, view=self)
+        if page is not None:
+            serializer = PosterListSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+        serializer = PosterListSerializer(posters, many=True, context={'request': request})
         return Response(serializer.data)
 
 
@@ -69,7 +155,11 @@ class PosterDeleteView(APIView):
 
     def delete(self, request, pk):
         poster = get_object_or_404(Poster, pk=pk, user=request.user)
-        poster.image.delete(save=False)
+        # cached prompt renders can share one image file between posters
+        if poster.image and not Poster.objects.filter(image=poster.image.name).exclude(pk=poster.pk).exists():
+            poster.image.delete(save=False)
+            poster.thumbnail.delete(save=False)
+            poster.medium.delete(save=False)
         poster.delete()
         return Response({"message": "Poster deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
 
@@ -92,13 +182,7 @@ class SocialPostView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
-        platforms_in = request.data.get("platforms")
-        if isinstance(platforms_in, str):
-            platforms = ["facebook", "instagram"] if platforms_in.lower() == "both" else [platforms_in.lower()]
-        elif isinstance(platforms_in, list):
-            platforms = [str(p).lower() for p in platforms_in]
-        else:
-            platforms = []
+        platforms = parse_platforms(request.data.get("platforms"))
 
         caption = request.data.get("caption", "")
 
@@ -114,31 +198,90 @@ class SocialPostView(APIView):
             poster.save(update_fields=["caption"])
 
         image_url = poster.public_url
+        if not image_url and needs_requeue(poster):
+            # a failed upload, or a pending one no worker still holds
+            enqueue_upload(poster.pk)
+        if poster.upload_status == Poster.UPLOAD_FAILED:
+            return Response({"error": "Uploading the poster failed; it has been queued again.",
+                             "upload_status": poster.upload_status, "details": poster.upload_error},
+                            status=status.HTTP_409_CONFLICT)
         if not image_url:
-            return Response({"error": "Poster is not publicly accessible yet. Try again in a few seconds."},
+            return Response({"error": "Poster is not publicly accessible yet. Try again in a few seconds.",
+                             "upload_status": poster.upload_status},
                             status=status.HTTP_409_CONFLICT)
 
-        results = {}
-        if "facebook" in platforms:
-            if not account.fb_page_id:
-                results["facebook"] = {"error": "Missing fb_page_id in your SocialAccount."}
-            else:
-                results["facebook"] = post_to_facebook(
-                    access_token=account.access_token,
-                    page_id=account.fb_page_id,
-                    image_url=image_url,
-                    caption=caption,
-                )
-
-        if "instagram" in platforms:
-            if not account.instagram_id:
-                results["instagram"] = {"error": "Missing instagram_id in your SocialAccount."}
-            else:
-                results["instagram"] = post_to_instagram(
-                    access_token=account.access_token,
-                    instagram_id=account.instagram_id,
-                    image_url=image_url,
-                    caption=caption,
-                )
-
-        return Response(results, status=status.HTTP_200_OK)
\ No newline at end of file
+        # both platforms are published concurrently; each result carries its "elapsed" seconds
+        results = publish_to_platforms(account, platforms, image_url, caption)
+
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class ScheduledPostView(APIView):
+    """Queue posters for publishing at publish_at; the scheduler's dispatcher sends them."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        posts = ScheduledPost.objects.filter(user=request.user)
+        paginator = KeysetPagination(descending=True)
+        page = paginator.paginate_queryset(posts, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(ScheduledPostSerializer(page, many=True).data)
+        return Response(ScheduledPostSerializer(posts.order_by("-created_at"), many=True).data)
+
+    def post(self, request):
+        platforms = parse_platforms(request.data.get("platforms"))
+        valid_platforms = {choice for choice, _ in ScheduledPost.PLATFORM_CHOICES}
+        if not platforms or not set(platforms) <= valid_platforms:
+            return Response({"error": "platforms must be facebook, instagram or both."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        poster_ids = request.data.get("posters")
+        if poster_ids is None and request.data.get("poster") is not None:
+            poster_ids = [request.data.get("poster")]
+        if not isinstance(poster_ids, list) or not poster_ids:
+            return Response({"error": "posters must be a non-empty list of poster ids."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            poster_ids = {int(pk) for pk in poster_ids}
+        except (TypeError, ValueError):
+            return Response({"error": "posters must be a non-empty list of poster ids."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        posters = {p.pk: p for p in Poster.objects.filter(user=request.user, pk__in=poster_ids)}
+        missing = sorted(poster_ids - set(posters))
+        if missing:
+            return Response({"error": "Unknown poster(s).", "posters": missing}, status=status.HTTP_400_BAD_REQUEST)
+
+        publish_at_in = request.data.get("publish_at")
+        publish_at = parse_datetime(str(publish_at_in)) if publish_at_in else timezone.now()
+        if publish_at is None:
+            return Response({"error": "publish_at must be an ISO 8601 datetime."}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(publish_at):
+            publish_at = timezone.make_aware(publish_at)
+
+        caption = request.data.get("caption")
+        scheduled = ScheduledPost.objects.bulk_create(
+            ScheduledPost(
+                user=request.user,
+                poster=poster,
+                platform=platform,
+                caption=caption if caption is not None else (poster.caption or ""),
+                publish_at=publish_at,
+                due_at=publish_at,
+            )
+            for poster in posters.values()
+            for platform in dict.fromkeys(platforms)
+        )
+        return Response(ScheduledPostSerializer(scheduled, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class ScheduledPostCancelView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request, pk):
+        cancelled = ScheduledPost.objects.filter(
+            pk=pk, user=request.user, status=ScheduledPost.SCHEDULED
+        ).update(status=ScheduledPost.CANCELLED)
+        if not cancelled:
+            post = get_object_or_404(ScheduledPost, pk=pk, user=request.user)
+            return Response({"error": f"Post is already {post.status}."}, status=status.HTTP_409_CONFLICT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
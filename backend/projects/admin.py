@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Project,Task
+from .models import Project, RepoSyncState, Task
 # Register your models here.
 
 admin.site.register(Project)
-admin.site.register(Task)
\ No newline at end of file
+admin.site.register(Task)
+admin.site.register(RepoSyncState)
\ No newline at end of file
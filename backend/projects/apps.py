@@ -5,6 +5,5 @@ class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects' 
 
-    def ready(self):
-        from .scheduler import start  # import your scheduler start function
-        start()
\ No newline at end of file
+    # The GitHub sync scheduler runs in its own worker: `python manage.py run_scheduler`.
+    # Starting it here would launch one copy per web worker, management command and test run.
@@ -0,0 +1,47 @@
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SchedulerLock
+
+
+class LeaderLock:
+    """
+    DB-backed lease: whoever holds an unexpired row for `name` is the leader.
+    The holder must renew() before `ttl` runs out or another process may take over.
+    """
+
+    def __init__(self, name, ttl=timedelta(seconds=60)):
+        self.name = name
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self):
+        now = timezone.now()
+        expires_at = now + self.ttl
+        taken = SchedulerLock.objects.filter(
+            Q(expires_at__lt=now) | Q(owner=self.owner), name=self.name
+        ).update(owner=self.owner, expires_at=expires_at)
+        if taken:
+            return True
+        try:
+            with transaction.atomic():
+                SchedulerLock.objects.create(name=self.name, owner=self.owner, expires_at=expires_at)
+            return True
+        except IntegrityError:
+            # somebody else holds an unexpired lease
+            return False
+
+    def renew(self):
+        return bool(
+            SchedulerLock.objects.filter(name=self.name, owner=self.owner)
+            .update(expires_at=timezone.now() + self.ttl)
+        )
+
+    def release(self):
+        SchedulerLock.objects.filter(name=self.name, owner=self.owner).delete()
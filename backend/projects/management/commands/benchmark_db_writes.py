@@ -0,0 +1,117 @@
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from backend.database import sqlite_options
+
+ALIAS = "write_benchmark"
+TABLE = "db_write_benchmark"
+
+
+def profiles_for(default, scratch):
+    """The profiles to compare for the configured engine, as DATABASES entries."""
+    if default["ENGINE"].endswith("sqlite3"):
+        # never touch the real file: each profile writes to its own scratch database
+        return {
+            "sqlite-default": {**default, "NAME": os.path.join(scratch, "default.sqlite3"), "OPTIONS": {}},
+            "sqlite-tuned": {
+                **default, "NAME": os.path.join(scratch, "tuned.sqlite3"), "OPTIONS": sqlite_options(),
+            },
+        }
+    return {
+        f"{default['ENGINE'].rsplit('.', 1)[-1]}-per-request": {**default, "CONN_MAX_AGE": 0},
+        f"{default['ENGINE'].rsplit('.', 1)[-1]}-persistent": {
+            **default, "CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True,
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent write throughput for each database profile: threads run "
+        "read-then-write transactions the way request handlers and the scheduler do."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--transactions", type=int, default=100, help="Transactions per thread.")
+
+    def handle(self, *args, **options):
+        results = {}
+        scratch = tempfile.mkdtemp(prefix="db-bench-")
+        try:
+            for name, config in profiles_for(settings.DATABASES["default"], scratch).items():
+                results[name] = self.run_profile(config, options["threads"], options["transactions"])
+                stats = results[name]
+                self.stdout.write(
+                    f"{name}: {stats['throughput']:.0f} writes/s, p50 {stats['p50']:.1f} ms, "
+                    f"p95 {stats['p95']:.1f} ms, {stats['errors']} error(s)"
+                )
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        (baseline_name, baseline), (candidate_name, candidate) = results.items()
+        if baseline["throughput"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"{candidate_name} wrote {candidate['throughput'] / baseline['throughput']:.1f}x "
+                f"the throughput of {baseline_name}."
+            ))
+
+    def run_profile(self, config, threads, transactions):
+        connections.settings[ALIAS] = connections.configure_settings({"default": config})["default"]
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def worker(number):
+            mine, failed = [], 0
+            for _ in range(transactions):
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=ALIAS), connections[ALIAS].cursor() as cursor:
+                        cursor.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE worker = %s", [number])
+                        count = cursor.fetchone()[0]
+                        cursor.execute(f"INSERT INTO {TABLE} (worker, n) VALUES (%s, %s)", [number, count])
+                    mine.append(time.perf_counter() - started)
+                except OperationalError:
+                    failed += 1
+                finally:
+                    # what Django does at the end of every request
+                    connections[ALIAS].close_if_unusable_or_obsolete()
+            connections[ALIAS].close()
+            with lock:
+                latencies.extend(mine)
+                errors.append(failed)
+
+        try:
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} (worker integer, n integer)")
+            connections[ALIAS].close()
+
+            started = time.perf_counter()
+            pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+
+        latencies.sort()
+        return {
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+            "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+            "errors": sum(errors),
+        }
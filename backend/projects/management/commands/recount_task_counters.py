@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored total_tasks/completed_tasks counters on projects."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rewrite every project instead of only the ones whose counters drifted.",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            updated = Project.objects.recount_tasks()
+        else:
+            drifted = list(Project.objects.with_counter_drift().values_list("pk", flat=True))
+            updated = Project.objects.filter(pk__in=drifted).recount_tasks() if drifted else 0
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted task counters for {updated} project(s)."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from projects import scheduler
+
+
+class Command(BaseCommand):
+    help = "Run the background job scheduler (GitHub task sync). Only one instance polls at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run every job once in the foreground and exit, e.g. from cron.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=int,
+            default=15,
+            help="Seconds a standby instance waits between attempts to take the leader lock.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            if not scheduler.run_once():
+                self.stdout.write("Another scheduler instance holds the lock; nothing to do.")
+            return
+        self.stdout.write("Starting scheduler (Ctrl+C to stop)...")
+        scheduler.run(poll_interval=options["poll_interval"])
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:25
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_task_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    projects = Project.objects.annotate(
+        n_total=Count('tasks'),
+        n_completed=Count('tasks', filter=Q(tasks__is_completed=True)),
+    )
+    for project in projects.iterator():
+        project.total_tasks = project.n_total
+        project.completed_tasks = project.n_completed
+        project.save(update_fields=['total_tasks', 'completed_tasks'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_github_repo_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='total_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_task_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reposyncstate',
+            name='scanned_task_id',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -1,7 +1,44 @@
 from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from employees.models import Employee  # reuse your existing Employee model
 
+
+class ProjectQuerySet(models.QuerySet):
+    def recount_tasks(self):
+        """
+        Recompute the stored task counters for every project in the queryset
+        with a single UPDATE. Use after bulk task writes that bypass Task.save/delete.
+        """
+        def task_count(**filters):
+            return Coalesce(
+                Subquery(
+                    Task.objects.filter(project=OuterRef("pk"), **filters)
+                    .order_by()
+                    .values("project")
+                    .annotate(n=Count("pk"))
+                    .values("n")
+                ),
+                Value(0),
+            )
+
+        return self.update(
+            total_tasks=task_count(),
+            completed_tasks=task_count(is_completed=True),
+        )
+
+    def with_counter_drift(self):
+        """Projects whose stored counters no longer match their tasks."""
+        return self.annotate(
+            actual_total=Count("tasks"),
+            actual_completed=Count("tasks", filter=Q(tasks__is_completed=True)),
+        ).exclude(
+            total_tasks=F("actual_total"),
+            completed_tasks=F("actual_completed"),
+        )
+
+
 class Project(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="projects")
     name = models.CharField(max_length=200)
@@ -12,13 +49,38 @@ class Project(models.Model):
     # New field for GitHub repository
     github_repo_url = models.URLField(blank=True, null=True)
 
+    # Denormalized task counters, maintained by Task.save/delete and recount_tasks()
+    total_tasks = models.PositiveIntegerField(default=0, editable=False)
+    completed_tasks = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    COUNTER_FIELDS = ("total_tasks", "completed_tasks")
+
     @property
     def progress(self):
-        total = self.tasks.count()
-        if total == 0:
+        if self.total_tasks == 0:
             return 0
-        completed = self.tasks.filter(is_completed=True).count()
-        return int((completed / total) * 100)
+        return int((self.completed_tasks / self.total_tasks) * 100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="project_user_created_idx"),
+            models.Index(fields=["user", "deadline"], name="project_user_deadline_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # counters are owned by Task writes; never overwrite them with stale in-memory values
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def refresh_task_counters(self):
+        Project.objects.filter(pk=self.pk).recount_tasks()
+        self.refresh_from_db(fields=self.COUNTER_FIELDS)
 
     def __str__(self):
         return self.name
@@ -28,5 +90,82 @@ class Task(models.Model):
     name = models.CharField(max_length=200)
     is_completed = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # pending/completed tasks of a project: progress recounts and the GitHub sync
+            models.Index(fields=["project", "is_completed"], name="task_project_done_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored state so save()/delete() can apply counter deltas
+        if "project_id" in instance.__dict__ and "is_completed" in instance.__dict__:
+            instance._stored = (instance.project_id, instance.is_completed)
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        stored = getattr(self, "_stored", None)
+        super().save(*args, **kwargs)
+
+        if adding:
+            self._bump_counters(self.project_id, 1, int(self.is_completed))
+        elif stored is None:
+            # loaded with deferred fields, so there is nothing to diff against
+            Project.objects.filter(pk=self.project_id).recount_tasks()
+        elif stored[0] != self.project_id:
+            self._bump_counters(stored[0], -1, -int(stored[1]))
+            self._bump_counters(self.project_id, 1, int(self.is_completed))
+        elif stored[1] != self.is_completed:
+            self._bump_counters(self.project_id, 0, int(self.is_completed) - int(stored[1]))
+        self._stored = (self.project_id, self.is_completed)
+
+    def delete(self, *args, **kwargs):
+        stored = getattr(self, "_stored", None)
+        project_id = self.project_id
+        result = super().delete(*args, **kwargs)
+        if stored is None:
+            Project.objects.filter(pk=project_id).recount_tasks()
+        else:
+            self._bump_counters(stored[0], -1, -int(stored[1]))
+        self._stored = None
+        return result
+
+    @staticmethod
+    def _bump_counters(project_id, total, completed):
+        if total or completed:
+            Project.objects.filter(pk=project_id).update(
+                total_tasks=F("total_tasks") + total,
+                completed_tasks=F("completed_tasks") + completed,
+            )
+
+    def __str__(self):
+        return f"{self.name} ({'Done' if self.is_completed else 'Pending'})"
+
+
+class RepoSyncState(models.Model):
+    """Conditional-request cursor for a project's GitHub repository."""
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, related_name="repo_sync_state")
+    repo_url = models.URLField()
+    etag = models.CharField(max_length=200, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    last_commit_sha = models.CharField(max_length=64, blank=True)
+    last_commit_at = models.DateTimeField(blank=True, null=True)
+    rate_limit_remaining = models.IntegerField(blank=True, null=True)
+    # newest pending task already matched against the full window; a newer one forces a rescan
+    scanned_task_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.repo_url} @ {self.last_commit_sha[:7] or '-'}"
+
+
+class SchedulerLock(models.Model):
+    """Lease row electing the single process that runs the background scheduler."""
+    name = models.CharField(max_length=100, primary_key=True)
+    owner = models.CharField(max_length=200)
+    expires_at = models.DateTimeField()
+
     def __str__(self):
-        return f"{self.name} ({'Done' if self.is_completed else 'Pending'})"
\ No newline at end of file
+        return f"{self.name} held by {self.owner} until {self.expires_at:%Y-%m-%d %H:%M:%S}"
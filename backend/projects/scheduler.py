@@ -1,15 +1,105 @@
 # scheduler.py
-from apscheduler.schedulers.background import BackgroundScheduler
+import logging
+import time
+from datetime import timedelta
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from marketing.dispatcher import dispatch_due_posts
+from marketing.jobs import recover_jobs
+from marketing.uploader import recover_uploads
+
+from .leader import LeaderLock
 from .utils.github_tasks import check_github_tasks
 
-scheduler = BackgroundScheduler()
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "scheduler"
+LOCK_TTL = timedelta(seconds=60)
+
+scheduler = BlockingScheduler()
+
+
+def db_job(func):
+    """Jobs run on APScheduler's thread pool, so give each run fresh DB connections."""
+    def run():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    run.__name__ = func.__name__
+    return run
 
-def start():
-    if not scheduler.get_job('github_task_check'):
-     
+
+def register_jobs():
+    # use minutes=1 for nearly live experience; a slow run must never overlap the
+    # next tick, and missed ticks collapse into one
+    scheduler.add_job(
+        db_job(check_github_tasks), 'interval', minutes=1, id='github_task_check',
+        max_instances=1, coalesce=True, next_run_time=timezone.now(), replace_existing=True,
+    )
+    # scheduled social posts; the dispatcher fans out per account internally
+    scheduler.add_job(
+        db_job(dispatch_due_posts), 'interval', seconds=settings.SOCIAL_DISPATCH["INTERVAL"],
+        id='scheduled_post_dispatch', max_instances=1, coalesce=True, replace_existing=True,
+    )
+    # poster jobs live in web processes' memory; pick up the ones a restart dropped
+    scheduler.add_job(
+        db_job(recover_jobs), 'interval', minutes=1, id='poster_job_recovery',
+        max_instances=1, coalesce=True, next_run_time=timezone.now(), replace_existing=True,
+    )
+    # likewise for Cloudinary uploads left pending
+    scheduler.add_job(
+        db_job(recover_uploads), 'interval', minutes=1, id='poster_upload_recovery',
+        max_instances=1, coalesce=True, next_run_time=timezone.now(), replace_existing=True,
+    )
+
+
+def run_once():
+    """Run every job a single time, unless another instance currently leads."""
+    lock = LeaderLock(LOCK_NAME, ttl=LOCK_TTL)
+    if not lock.acquire():
+        logger.info("Scheduler lock held elsewhere; skipping this run")
+        return False
+    try:
         check_github_tasks()
+        dispatch_due_posts()
+        recover_jobs()
+        recover_uploads()
+    finally:
+        lock.release()
+    return True
+
+
+def run(poll_interval=15):
+    """
+    Block forever running the scheduled jobs, but only while this process holds the
+    leader lock. Standby instances keep retrying so one takes over if the leader dies.
+    """
+    lock = LeaderLock(LOCK_NAME, ttl=LOCK_TTL)
+    while not lock.acquire():
+        logger.info("Scheduler lock held elsewhere; retrying in %ss", poll_interval)
+        time.sleep(poll_interval)
+    logger.info("Acquired scheduler lock as %s", lock.owner)
+
+    def heartbeat():
+        if not lock.renew():
+            logger.error("Lost the scheduler lock; shutting down")
+            scheduler.shutdown(wait=False)
 
-        #Schedule to run every 24 hours
-        scheduler.add_job(check_github_tasks, 'interval', minutes=1, id='github_task_check')
-        #use minutes=1 for nearly live experience
-        scheduler.start()
\ No newline at end of file
+    register_jobs()
+    scheduler.add_job(
+        db_job(heartbeat), 'interval', seconds=LOCK_TTL.total_seconds() / 3, id='leader_heartbeat',
+        max_instances=1, coalesce=True, replace_existing=True,
+    )
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        close_old_connections()
+        lock.release()
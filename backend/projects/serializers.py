@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Project, Task
 from employees.models import Employee
@@ -12,14 +13,35 @@ class TaskSerializer(serializers.ModelSerializer):
             "id": {"read_only": True}
         }
 
+class ProjectTaskSerializer(TaskSerializer):
+    """Nested tasks of a project; a task sent back with its id is updated in place."""
+    id = serializers.IntegerField(required=False)
+
+
+class EmployeeIdsField(serializers.ListField):
+    """
+    A list of employee ids resolved to Employee objects with one query, limited to
+    the requesting user's employees. Missing and foreign ids are reported together.
+    """
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        ids = list(dict.fromkeys(super().to_internal_value(data)))
+        request = self.context.get("request")
+        assert request is not None, (
+            "EmployeeIdsField needs the request in the serializer context to scope employees."
+        )
+        employees = list(Employee.objects.filter(user=request.user, pk__in=ids)) if ids else []
+        unknown = sorted(set(ids) - {employee.pk for employee in employees})
+        if unknown:
+            raise serializers.ValidationError(f"Unknown employee id(s): {unknown}")
+        return employees
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     employees = EmployeeSerializer(many=True, read_only=True)
-    employee_ids = serializers.PrimaryKeyRelatedField(
-        queryset=Employee.objects.all(),
-        many=True,
-        write_only=True
-    )
-    tasks = TaskSerializer(many=True)
+    employee_ids = EmployeeIdsField(write_only=True)
+    tasks = ProjectTaskSerializer(many=True)
     progress = serializers.ReadOnlyField()
     
     github_repo_url = serializers.URLField(required=False, allow_blank=True)  # new field
@@ -39,11 +61,66 @@ class ProjectSerializer(serializers.ModelSerializer):
         project = Project.objects.create(**validated_data)
         project.employees.set(employee_ids)
     
-        for task_data in tasks_data:
-            Task.objects.create(project=project, **task_data)
+        Task.objects.bulk_create(
+            Task(project=project, name=task["name"], is_completed=task.get("is_completed", False))
+            for task in tasks_data
+        )
+        project.refresh_task_counters()
     
         return project
-    
+
+    def validate_tasks(self, tasks):
+        ids = [task["id"] for task in tasks if "id" in task]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each task id may appear only once.")
+        if ids:
+            known = set(self.instance.tasks.filter(pk__in=ids).values_list("pk", flat=True)) if self.instance else set()
+            unknown = sorted(set(ids) - known)
+            if unknown:
+                raise serializers.ValidationError(f"Unknown task id(s) for this project: {unknown}")
+        return tasks
+
+    def sync_tasks(self, instance, tasks_data):
+        """
+        Make the project's tasks match tasks_data while keeping task ids stable:
+        matching rows are left alone, changed ones go through one bulk_update, new ones
+        through one bulk_create, and only tasks missing from the payload are deleted.
+        Items without an id claim an unmatched existing task of the same name.
+        """
+        existing = {task.pk: task for task in instance.tasks.all()}
+        claimed = {task["id"] for task in tasks_data if "id" in task}
+        unclaimed_by_name = {}
+        for task in existing.values():
+            if task.pk not in claimed:
+                unclaimed_by_name.setdefault(task.name, []).append(task)
+
+        changed, created = [], []
+        for data in tasks_data:
+            if "id" in data:
+                task = existing[data["id"]]
+            elif unclaimed_by_name.get(data["name"]):
+                task = unclaimed_by_name[data["name"]].pop(0)
+                claimed.add(task.pk)
+            else:
+                created.append(Task(project=instance, name=data["name"], is_completed=data.get("is_completed", False)))
+                continue
+            updates = {field: data[field] for field in ("name", "is_completed") if field in data}
+            if any(getattr(task, field) != value for field, value in updates.items()):
+                for field, value in updates.items():
+                    setattr(task, field, value)
+                changed.append(task)
+
+        removed = existing.keys() - claimed
+        if removed:
+            Task.objects.filter(pk__in=removed).delete()
+        if changed:
+            Task.objects.bulk_update(changed, ["name", "is_completed"])
+        if created:
+            Task.objects.bulk_create(created)
+        if removed or changed or created:
+            instance.refresh_task_counters()
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         employee_ids = validated_data.pop("employee_ids", None)
         tasks_data = validated_data.pop("tasks", None)
@@ -55,9 +132,7 @@ class ProjectSerializer(serializers.ModelSerializer):
             instance.employees.set(employee_ids)
     
         if tasks_data is not None:
-            instance.tasks.all().delete()
-            for task_data in tasks_data:
-                Task.objects.create(project=instance, **task_data)
+            self.sync_tasks(instance, tasks_data)
     
         instance.save()
         return instance
\ No newline at end of file
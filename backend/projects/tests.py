@@ -1,3 +1,516 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.database import database_config
+from employees.models import Employee
+
+from .leader import LeaderLock
+from .models import Project, RepoSyncState, SchedulerLock, Task
+from . import scheduler
+from .utils import github_tasks
+
+
+class TaskCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.project = Project.objects.create(user=self.user, name="Site", deadline=date(2030, 1, 1))
+
+    def counters(self):
+        self.project.refresh_from_db()
+        return self.project.total_tasks, self.project.completed_tasks
+
+    def test_task_save_and_delete_maintain_counters(self):
+        first = Task.objects.create(project=self.project, name="design")
+        Task.objects.create(project=self.project, name="build", is_completed=True)
+        self.assertEqual(self.counters(), (2, 1))
+
+        first.is_completed = True
+        first.save()
+        self.assertEqual(self.counters(), (2, 2))
+        self.assertEqual(self.project.progress, 100)
+
+        Task.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.counters(), (1, 1))
+
+    def test_progress_reads_do_not_query(self):
+        Task.objects.create(project=self.project, name="design", is_completed=True)
+        Task.objects.create(project=self.project, name="build")
+        project = Project.objects.get(pk=self.project.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(project.progress, 50)
+
+    def test_project_save_does_not_overwrite_counters(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        Task.objects.create(project=self.project, name="design")
+        stale.name = "Renamed"
+        stale.save()
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_serializer_replaces_tasks_and_recounts(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        Task.objects.create(project=self.project, name="old")
+
+        response = client.put(
+            f"/api/projects/{self.project.pk}/",
+            {"tasks": [{"name": "a", "is_completed": True}, {"name": "b"}, {"name": "c"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["progress"], 33)
+        self.assertEqual(self.counters(), (3, 1))
+
+    def test_serializer_diffs_tasks_by_id(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        keep, rename, drop, by_name = (
+            Task.objects.create(project=self.project, name=name) for name in ("keep", "rename", "drop", "by name")
+        )
+        tasks = [
+            {"id": keep.pk, "name": "keep"},
+            {"id": rename.pk, "name": "renamed", "is_completed": True},
+            {"name": "by name"},  # no id: matched to the existing task of that name
+            {"name": "new"},
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.put(f"/api/projects/{self.project.pk}/", {"tasks": tasks}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        ids = {task["name"]: task["id"] for task in response.data["tasks"]}
+        self.assertEqual(
+            (ids["keep"], ids["renamed"], ids["by name"]), (keep.pk, rename.pk, by_name.pk)
+        )
+        self.assertFalse(Task.objects.filter(pk=drop.pk).exists())
+        self.assertEqual(self.counters(), (4, 1))
+        task_writes = [
+            q["sql"].split()[0] for q in queries
+            if q["sql"].startswith(("INSERT", "UPDATE", "DELETE")) and '"projects_task"' in q["sql"].split("(")[0]
+        ]
+        self.assertEqual(sorted(task_writes), ["DELETE", "INSERT", "UPDATE"])
+
+    def test_serializer_rejects_foreign_task_ids(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        other = Project.objects.create(user=self.user, name="Other", deadline=date(2030, 1, 1))
+        foreign = Task.objects.create(project=other, name="theirs")
+        response = client.put(
+            f"/api/projects/{self.project.pk}/", {"tasks": [{"id": foreign.pk, "name": "mine"}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.name, "theirs")
+
+    def assign_employees(self, client, count):
+        employees = Employee.objects.bulk_create(
+            Employee(user=self.user, name=f"e{i}", email=f"{count}-{i}@example.com", position="Dev", department="Eng")
+            for i in range(count)
+        )
+        self.project.employees.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.put(
+                f"/api/projects/{self.project.pk}/", {"employee_ids": [e.pk for e in employees]}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.project.employees.count(), count)
+        return len(queries)
+
+    def test_employee_ids_resolve_in_constant_queries(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(self.assign_employees(client, 2), self.assign_employees(client, 200))
+
+    def test_employee_ids_are_scoped_to_the_user(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        mine = Employee.objects.create(user=self.user, name="m", email="m@example.com", position="Dev", department="Eng")
+        theirs = Employee.objects.create(
+            user=User.objects.create_user("other"), name="t", email="t@example.com", position="Dev", department="Eng"
+        )
+        response = client.put(
+            f"/api/projects/{self.project.pk}/", {"employee_ids": [mine.pk, theirs.pk, 9999]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(sorted([theirs.pk, 9999])), str(response.data["employee_ids"]))
+        self.assertFalse(self.project.employees.exists())
+
+    def test_recount_command_repairs_drift(self):
+        Task.objects.create(project=self.project, name="design")
+        Task.objects.filter(project=self.project).update(is_completed=True)
+        Project.objects.filter(pk=self.project.pk).update(total_tasks=7)
+
+        call_command("recount_task_counters", stdout=StringIO())
+        self.assertEqual(self.counters(), (1, 1))
+
+
+class ProjectListQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.employee = Employee.objects.create(
+            user=self.user, name="Ana", email="ana@example.com", position="Dev", department="Eng"
+        )
+
+    def add_projects(self, count):
+        for i in range(count):
+            project = Project.objects.create(user=self.user, name=f"p{i}", deadline=date(2030, 1, 1))
+            project.employees.add(self.employee)
+            Task.objects.create(project=project, name="design", is_completed=True)
+            Task.objects.create(project=project, name="build")
+
+    def test_list_query_count_is_constant(self):
+        self.add_projects(1)
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/projects/all/")
+        self.assertEqual(len(response.data), 1)
+
+        self.add_projects(99)
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/projects/all/")
+        self.assertEqual(len(response.data), 100)
+        self.assertEqual(response.data[-1]["progress"], 50)
+        self.assertEqual(len(response.data[-1]["tasks"]), 2)
+
+    def test_detail_prefetches_relations(self):
+        self.add_projects(1)
+        project = Project.objects.get()
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/projects/{project.pk}/")
+        self.assertEqual(response.data["employees"][0]["name"], "Ana")
+
+
+class StubGitHub:
+    """
+    Local HTTP server imitating GET /repos/<owner>/<repo>/commits.
+
+    `commits` maps "owner/repo" to commit messages, newest first; commit i of n is
+    dated n - i minutes after BASE so prepending a message creates a newer commit.
+    """
+    BASE = datetime.now(dt_timezone.utc).replace(second=0, microsecond=0) - timedelta(days=1)
+
+    def __init__(self, commits, delay=0.0):
+        self.commits = commits
+        self.delay = delay
+        self.inflight = self.max_inflight = 0
+        self.requests = []
+        self.headers = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub.lock:
+                    stub.inflight += 1
+                    stub.max_inflight = max(stub.max_inflight, stub.inflight)
+                    stub.requests.append(self.path)
+                    stub.headers.append(dict(self.headers))
+                time.sleep(stub.delay)
+                try:
+                    self.handle_commits()
+                finally:
+                    with stub.lock:
+                        stub.inflight -= 1
+
+            def handle_commits(self):
+                url = urlsplit(self.path)
+                repo = url.path.removeprefix("/repos/").removesuffix("/commits")
+                if repo not in stub.commits:
+                    return self.respond(404, {"message": "Not Found"})
+
+                query = parse_qs(url.query)
+                since = query.get("since", [None])[0]
+                per_page = int(query.get("per_page", [30])[0])
+                page = int(query.get("page", [1])[0])
+                commits = [c for c in stub.commit_list(repo) if since is None or c["commit"]["committer"]["date"] >= since]
+                body = commits[(page - 1) * per_page:page * per_page]
+                link = None
+                if page * per_page < len(commits):
+                    link = f'<{stub.url}{url.path}?since={since}&per_page={per_page}&page={page + 1}>; rel="next"'
+
+                payload = json.dumps(body).encode()
+                etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    return self.respond(304, None, etag)
+                self.respond(200, body, etag, link)
+
+            def respond(self, code, body, etag=None, link=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("X-RateLimit-Remaining", "4999")
+                if etag:
+                    self.send_header("ETag", etag)
+                if link:
+                    self.send_header("Link", link)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def commit_list(self, repo):
+        messages = self.commits[repo]
+        return [
+            {
+                "sha": hashlib.sha1(f"{repo}:{message}".encode()).hexdigest(),
+                "commit": {
+                    "message": message,
+                    "committer": {
+                        "date": (self.BASE + timedelta(minutes=len(messages) - i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+                    },
+                },
+            }
+            for i, message in enumerate(messages)
+        ]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.patch = mock.patch.object(github_tasks, "GITHUB_API_URL", self.url)
+        self.patch.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class GitHubSyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass1234")
+
+    def make_project(self, repo, *task_names):
+        project = Project.objects.create(
+            user=self.user, name=repo, deadline=date(2030, 1, 1),
+            github_repo_url=f"https://github.com/{repo}",
+        )
+        for name in task_names:
+            Task.objects.create(project=project, name=name)
+        return project
+
+    def test_marks_tasks_named_in_commits(self):
+        project = self.make_project("acme/site", "Add login", "Add footer")
+        broken = self.make_project("acme/missing", "Anything")
+
+        with StubGitHub({"acme/site": ["Add login", "Fix typo"]}), self.assertLogs(github_tasks.logger, "INFO") as logs:
+            github_tasks.check_github_tasks()
+
+        self.assertEqual(
+            list(project.tasks.filter(is_completed=True).values_list("name", flat=True)), ["Add login"]
+        )
+        self.assertFalse(broken.tasks.filter(is_completed=True).exists())
+        self.assertTrue(any("2 repos" in line and "1 failed" in line for line in logs.output))
+
+    def test_fetches_concurrently_within_host_limit(self):
+        repos = {f"acme/repo{i}": ["done"] for i in range(8)}
+        for repo in repos:
+            self.make_project(repo, "done")
+
+        with StubGitHub(repos, delay=0.2) as stub, mock.patch.object(github_tasks, "PER_HOST_LIMIT", 3):
+            started = time.monotonic()
+            github_tasks.check_github_tasks()
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(stub.max_inflight, 3)
+        self.assertLess(elapsed, 8 * 0.2)
+        self.assertEqual(Task.objects.filter(is_completed=False).count(), 0)
+
+    def test_unchanged_repos_get_not_modified(self):
+        project = self.make_project("acme/site", "Add login", "Add footer")
+        repos = {"acme/site": ["Add login", "Initial commit"]}
+
+        with StubGitHub(repos) as stub:
+            first = github_tasks.check_github_tasks()
+            state = RepoSyncState.objects.get(project=project)
+            self.assertEqual(state.last_commit_at, StubGitHub.BASE + timedelta(minutes=2))
+
+            # the cursor moved, so the next poll fetches the newest commit once and stores its ETag
+            github_tasks.check_github_tasks()
+            third = github_tasks.check_github_tasks()
+
+            repos["acme/site"].insert(0, "Add footer")
+            fourth = github_tasks.check_github_tasks()
+
+        self.assertEqual(first["not_modified"], 0)
+        self.assertEqual(third["not_modified"], 1)
+        self.assertEqual(third["rate_limit_remaining"], 4999)
+        self.assertEqual(fourth["tasks_completed"], 1)
+        cursor = (StubGitHub.BASE + timedelta(minutes=2)).strftime("%Y-%m-%dT%H%%3A%M%%3A%SZ")
+        self.assertIn(f"since={cursor}", stub.requests[-1])
+        self.assertEqual(project.tasks.filter(is_completed=False).count(), 0)
+
+    def test_changing_the_repo_url_resets_the_sync_state(self):
+        project = self.make_project("acme/site", "Add login")
+        repos = {"acme/site": ["Initial commit"], "acme/renamed": ["Add login"]}
+
+        with StubGitHub(repos) as stub:
+            github_tasks.check_github_tasks()
+            project.github_repo_url = "https://github.com/acme/renamed"
+            project.save()
+            stats = github_tasks.check_github_tasks()
+
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(stats["tasks_completed"], 1)
+        # the old repository's cursor is not carried over
+        self.assertIn("/repos/acme/renamed/commits", stub.requests[-1])
+        state = RepoSyncState.objects.get(project=project)
+        self.assertEqual(state.repo_url, "https://github.com/acme/renamed")
+        self.assertEqual(state.last_commit_sha, hashlib.sha1(b"acme/renamed:Add login").hexdigest())
+
+    def test_follows_pages_and_stops_once_everything_matched(self):
+        project = self.make_project("acme/busy", "commit 240", "commit 120")
+        # newest first: "commit 249" ... "commit 0", spread over three pages of 100
+        repos = {"acme/busy": [f"commit {i}" for i in reversed(range(250))]}
+
+        with StubGitHub(repos) as stub:
+            stats = github_tasks.check_github_tasks()
+
+        # "commit 120" sits on page two; page three is never requested
+        self.assertEqual(project.tasks.filter(is_completed=False).count(), 0)
+        self.assertEqual(stats["pages"], 2)
+        self.assertEqual(len(stub.requests), 2)
+
+        project.tasks.create(name="commit 300")
+        repos["acme/busy"].insert(0, "commit 250")
+        with StubGitHub(repos) as stub:
+            stats = github_tasks.check_github_tasks()
+            # a new pending task is matched against the whole window once...
+            self.assertNotIn("If-None-Match", stub.headers[-1])
+            self.assertEqual(stats["pages"], 3)
+
+            # ...after which polls go back to the cursor
+            repos["acme/busy"].insert(0, "commit 251")
+            stats = github_tasks.check_github_tasks()
+        self.assertEqual(stats["pages"], 1)
+        self.assertEqual(stats["tasks_completed"], 0)
+        cursor = (StubGitHub.BASE + timedelta(minutes=251)).strftime("%Y-%m-%dT%H%%3A%M%%3A%SZ")
+        self.assertIn(f"since={cursor}", stub.requests[-1])
+
+    def test_task_created_after_its_commit_is_completed(self):
+        project = self.make_project("acme/site", "Add login", "Someday")
+        repos = {"acme/site": ["Add footer", "Add login"]}
+
+        with StubGitHub(repos):
+            github_tasks.check_github_tasks()
+            github_tasks.check_github_tasks()
+            self.assertEqual(github_tasks.check_github_tasks()["not_modified"], 1)
+
+            # the commit is behind the cursor and unchanged since the last ETag
+            late = project.tasks.create(name="Add footer")
+            stats = github_tasks.check_github_tasks()
+
+        self.assertEqual(stats["tasks_completed"], 1)
+        late.refresh_from_db()
+        self.assertTrue(late.is_completed)
+        self.assertEqual(RepoSyncState.objects.get(project=project).scanned_task_id, late.pk)
+
+    def test_skips_repos_without_pending_tasks(self):
+        self.make_project("acme/site")
+        with StubGitHub({"acme/site": ["Add login"]}) as stub:
+            stats = github_tasks.check_github_tasks()
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stub.requests, [])
+
+    def test_writes_whole_run_in_bulk(self):
+        projects = [self.make_project(f"acme/repo{i}", "ship", "later") for i in range(4)]
+        repos = {f"acme/repo{i}": ["ship"] for i in range(4)}
+
+        with StubGitHub(repos), CaptureQueriesContext(connection) as queries:
+            report = github_tasks.check_github_tasks()
+
+        task_updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "projects_task"')]
+        task_selects = [q["sql"] for q in queries if 'FROM "projects_task"' in q["sql"] and q["sql"].startswith("SELECT")]
+        self.assertEqual(len(task_updates), 1)
+        self.assertEqual(len(task_selects), 1)
+
+        self.assertEqual(report["tasks_completed"], 4)
+        self.assertEqual(
+            sorted(item["project_id"] for item in report["completed"]), sorted(p.pk for p in projects)
+        )
+        for project in projects:
+            project.refresh_from_db()
+            self.assertEqual((project.total_tasks, project.completed_tasks), (2, 1))
+
+
+class LeaderLockTests(TestCase):
+    def test_only_one_holder_at_a_time(self):
+        first, second = LeaderLock("jobs"), LeaderLock("jobs")
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertTrue(first.acquire())  # re-acquiring our own lease just renews it
+
+        first.release()
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.renew())
+
+    def test_expired_lease_can_be_taken_over(self):
+        stale, fresh = LeaderLock("jobs"), LeaderLock("jobs")
+        self.assertTrue(stale.acquire())
+        SchedulerLock.objects.filter(name="jobs").update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertTrue(fresh.acquire())
+        self.assertFalse(stale.renew())
+
+    def test_run_once_skips_while_another_instance_leads(self):
+        LeaderLock(scheduler.LOCK_NAME).acquire()
+        with mock.patch.object(scheduler, "check_github_tasks") as check:
+            self.assertFalse(scheduler.run_once())
+        check.assert_not_called()
+
+    def test_app_startup_does_not_start_the_scheduler(self):
+        self.assertFalse(scheduler.scheduler.running)
+
+
+class DatabaseProfileTests(TestCase):
+    def test_sqlite_is_tuned_by_default(self):
+        config = database_config(Path("/srv"), environ={})
+        self.assertEqual(config["NAME"], Path("/srv/db.sqlite3"))
+        self.assertIn("PRAGMA busy_timeout=20000", config["OPTIONS"]["init_command"])
+        self.assertEqual(config["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        # the checked-in dev database keeps its journal mode
+        self.assertNotIn("journal_mode", config["OPTIONS"]["init_command"])
+
+        config = database_config(Path("/srv"), environ={"DB_NAME": "/var/lib/worklane/db.sqlite3"})
+        self.assertIn("PRAGMA journal_mode=WAL", config["OPTIONS"]["init_command"])
+        self.assertEqual(database_config(Path("/srv"), environ={"SQLITE_TUNED": "0"})["OPTIONS"], {})
+
+    def test_postgresql_keeps_checked_connections(self):
+        config = database_config(Path("/srv"), environ={"DB_ENGINE": "postgresql", "DB_NAME": "lane"})
+        self.assertEqual(config["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual((config["NAME"], config["CONN_MAX_AGE"], config["CONN_HEALTH_CHECKS"]), ("lane", 60, True))
 
-# Create your tests here.
+    def test_benchmark_compares_profiles(self):
+        # test cases may not open extra connections, so run the command in its own process
+        result = subprocess.run(
+            [sys.executable, "manage.py", "benchmark_db_writes", "--threads", "4", "--transactions", "10"],
+            cwd=settings.BASE_DIR, env={**os.environ, "DB_ENGINE": "sqlite"},
+            capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("sqlite-default:", result.stdout)
+        self.assertRegex(result.stdout, r"sqlite-tuned: .* 0 error\(s\)")
@@ -1,35 +1,273 @@
-import requests
-from datetime import datetime, timedelta
-from ..models import Project, Task
+import logging
 import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from dashboard.cache import bump_version as bump_dashboard_version
+
+from ..models import Project, RepoSyncState, Task
+
+logger = logging.getLogger(__name__)
 
 # Load .env file
 load_dotenv()  # looks for .env in your project root
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+SYNC_WORKERS = int(os.getenv("GITHUB_SYNC_WORKERS", 8))
+PER_HOST_LIMIT = int(os.getenv("GITHUB_SYNC_PER_HOST", 4))
+REQUEST_TIMEOUT = float(os.getenv("GITHUB_SYNC_TIMEOUT", 10))
+PAGE_SIZE = 100  # GitHub's maximum per_page for /commits
+
+
+class HostLimiter:
+    """Caps the number of in-flight requests per host across all worker threads."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._slots = defaultdict(lambda: threading.BoundedSemaphore(self.limit))
+
+    @contextmanager
+    def slot(self, url):
+        with self._lock:
+            semaphore = self._slots[urlparse(url).netloc]
+        with semaphore:
+            yield
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide keep-alive session whose pool is sized for the worker threads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SYNC_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HEADERS)
+            session.headers["Accept"] = "application/vnd.github+json"
+            _session = session
+        return _session
+
+
+def commits_url(repo_url):
+    # https://github.com/<owner>/<repo>[.git] -> <api>/repos/<owner>/<repo>/commits
+    path = urlparse(repo_url.strip()).path.strip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    return f"{GITHUB_API_URL}/repos/{path}/commits"
+
+
+def build_request(project, default_since, newest_task_id):
+    """
+    URL, params and conditional headers for one project's commits poll. The cursor
+    and ETag only cover commits the current pending tasks were matched against, so a
+    task newer than the last full scan gets one unconditional poll of the whole window.
+    """
+    url = commits_url(project.github_repo_url)
+    state = getattr(project, "repo_sync_state", None)
+    if state is None or state.repo_url != project.github_repo_url or newest_task_id > state.scanned_task_id:
+        return {"url": url, "params": {"since": default_since, "per_page": PAGE_SIZE}, "headers": {}}
+
+    # keep `since` fixed until a new commit arrives so the URL, and its ETag, stay stable
+    since = state.last_commit_at.strftime("%Y-%m-%dT%H:%M:%SZ") if state.last_commit_at else default_since
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+    return {"url": url, "params": {"since": since, "per_page": PAGE_SIZE}, "headers": headers}
+
+
+def _get(session, limiter, url, **kwargs):
+    with limiter.slot(url):
+        return session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+
+
+def iter_commits(session, limiter, response, result):
+    """
+    Yield commits from `response` and then from every following page, requesting
+    the next page (Link: rel="next") only once the caller has consumed this one.
+    """
+    while True:
+        response.raise_for_status()
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            result["rate_limit_remaining"] = int(remaining)
+        yield from response.json()
+
+        next_url = response.links.get("next", {}).get("url")
+        if not next_url:
+            return
+        result["pages"] += 1
+        response = _get(session, limiter, next_url)
+
+
+def fetch_commits(session, limiter, request, pending_names):
+    """
+    Match `pending_names` against commit messages, newest first, and stop paging
+    as soon as every pending name has been seen.
+    """
+    # runs on a worker thread: HTTP only, all ORM work stays on the calling thread
+    response = _get(session, limiter, request["url"], params=request["params"], headers=request["headers"])
+
+    result = {
+        "not_modified": response.status_code == 304,
+        "etag": response.headers.get("ETag", ""),
+        "last_modified": response.headers.get("Last-Modified", ""),
+        "rate_limit_remaining": None,
+        "pages": 1,
+        "matched": set(),
+        "newest": None,
+    }
+    if result["not_modified"]:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        result["rate_limit_remaining"] = int(remaining) if remaining is not None else None
+        return result
+
+    pending = set(pending_names)
+    for commit in iter_commits(session, limiter, response, result):
+        if result["newest"] is None:
+            # GitHub lists commits newest first
+            result["newest"] = (commit["sha"], parse_datetime(commit["commit"]["committer"]["date"]))
+        message = commit["commit"]["message"]
+        if message in pending:
+            pending.discard(message)
+            result["matched"].add(message)
+            if not pending:
+                break
+    return result
+
+
+def save_sync_state(project, result):
+    state = getattr(project, "repo_sync_state", None)
+    if state is None:
+        state = RepoSyncState(project=project, repo_url=project.github_repo_url)
+    elif state.repo_url != project.github_repo_url:
+        # the row is one-to-one with the project: reset it for the new repository
+        # rather than inserting a second one
+        state.repo_url = project.github_repo_url
+        state.etag = state.last_modified = state.last_commit_sha = ""
+        state.last_commit_at = None
+        state.scanned_task_id = 0
+    state.scanned_task_id = max(state.scanned_task_id, result["newest_task_id"])
+    state.etag = result["etag"]
+    state.last_modified = result["last_modified"]
+    state.rate_limit_remaining = result["rate_limit_remaining"]
+    if result["newest"] is not None:
+        state.last_commit_sha, state.last_commit_at = result["newest"]
+    state.save()
+
+
+def apply_sync_results(projects, fetched, completed):
+    """Write a whole run at once: one UPDATE for the tasks, one for the counters."""
+    task_ids = [item["task_id"] for item in completed]
+    project_ids = {item["project_id"] for item in completed}
+    with transaction.atomic():
+        if task_ids:
+            Task.objects.filter(id__in=task_ids).update(is_completed=True)
+            # queryset updates bypass Task.save and the dashboard signals
+            Project.objects.filter(pk__in=project_ids).recount_tasks()
+        for project, result in fetched:
+            save_sync_state(project, result)
+
+    for user_id in {project.user_id for project in projects if project.pk in project_ids}:
+        bump_dashboard_version(user_id)
+
 
 def check_github_tasks():
-    projects = Project.objects.exclude(github_repo_url__isnull=True).exclude(github_repo_url__exact="")
-    
-    for project in projects:
-        try:
-            repo_url = project.github_repo_url.rstrip("/").replace("https://github.com/", "")
-            commits_api = f"https://api.github.com/repos/{repo_url}/commits"
-            
-            # Only fetch commits from the last 7 days (adjustable)
-            since = (datetime.utcnow() - timedelta(days=7)).isoformat() + "Z"
-            response = requests.get(commits_api, headers=HEADERS, params={"since": since})
-            response.raise_for_status()
-            commits = response.json()
-            
-            commit_messages = [c["commit"]["message"] for c in commits]
-            
-            for task in project.tasks.filter(is_completed=False):
-                if task.name in commit_messages:
-                    task.is_completed = True
-                    task.save()
-                    print(f"Task '{task.name}' marked as completed in project '{project.name}'")
-        
-        except Exception as e:
-            print(f"Error checking repo {project.github_repo_url}: {e}")
\ No newline at end of file
+    """
+    Poll every GitHub-linked project and complete tasks whose name matches a commit
+    message. Returns a report of the run, including each completed task and error.
+    """
+    started = time.monotonic()
+    projects = list(
+        Project.objects.exclude(github_repo_url__isnull=True).exclude(github_repo_url__exact="")
+        .select_related("repo_sync_state")
+    )
+    stats = {"repos": len(projects), "skipped": 0, "not_modified": 0, "failed": 0, "pages": 0,
+             "tasks_completed": 0, "rate_limit_remaining": None, "completed": [], "errors": []}
+    if not projects:
+        return stats
+
+    # Only fetch commits from the last 7 days on the first poll of a repo
+    default_since = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    session = get_session()
+    limiter = HostLimiter(PER_HOST_LIMIT)
+    fetched = []
+
+    # one query for every pending task of every linked project, grouped in memory
+    pending_tasks = defaultdict(list)
+    for task in Task.objects.filter(project__in=projects, is_completed=False).only("id", "name", "project_id"):
+        pending_tasks[task.project_id].append(task)
+    # repos without pending tasks have nothing to resolve; their cursor simply waits
+    polled = [project for project in projects if pending_tasks[project.pk]]
+    stats["skipped"] = len(projects) - len(polled)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(SYNC_WORKERS, len(polled))), thread_name_prefix="github-sync") as pool:
+        futures = {
+            pool.submit(
+                fetch_commits, session, limiter,
+                build_request(project, default_since, max(task.pk for task in pending_tasks[project.pk])),
+                {task.name for task in pending_tasks[project.pk]},
+            ): project
+            for project in polled
+        }
+        for future in as_completed(futures):
+            project = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                stats["errors"].append({"project_id": project.pk, "repo": project.github_repo_url, "error": str(e)})
+                logger.warning("Error checking repo %s: %s", project.github_repo_url, e)
+                continue
+
+            remaining = result["rate_limit_remaining"]
+            if remaining is not None and (stats["rate_limit_remaining"] is None or remaining < stats["rate_limit_remaining"]):
+                stats["rate_limit_remaining"] = remaining
+            if result["not_modified"]:
+                stats["not_modified"] += 1
+                continue
+            stats["pages"] += result["pages"]
+            result["newest_task_id"] = max(task.pk for task in pending_tasks[project.pk])
+
+            for task in pending_tasks[project.pk]:
+                if task.name in result["matched"]:
+                    stats["completed"].append({
+                        "project_id": project.pk, "project": project.name,
+                        "task_id": task.pk, "task": task.name,
+                    })
+            fetched.append((project, result))
+
+    apply_sync_results(projects, fetched, stats["completed"])
+    stats["tasks_completed"] = len(stats["completed"])
+    for item in stats["completed"]:
+        logger.info("Task '%(task)s' marked as completed in project '%(project)s'", item)
+
+    stats["not_modified_rate"] = round(stats["not_modified"] / len(polled), 3) if polled else 0.0
+    stats["elapsed"] = round(time.monotonic() - started, 3)
+    logger.info(
+        "GitHub sync: %(repos)d repos in %(elapsed).2fs (%(skipped)d skipped, %(not_modified)d not modified, "
+        "%(failed)d failed, %(pages)d pages, %(tasks_completed)d tasks completed, "
+        "rate limit remaining %(rate_limit_remaining)s)",
+        stats,
+    )
+    return stats
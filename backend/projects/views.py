@@ -4,18 +4,25 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 
+from backend.pagination import KeysetPagination
+
 from .models import Project, Task
 from .serializers import ProjectSerializer, TaskSerializer
 
 
+def projects_for(user):
+    # progress reads the stored counters, so the nested lists are the only relations serialized
+    return Project.objects.filter(user=user).prefetch_related("employees", "tasks")
+
+
 class ProjectCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        serializer = ProjectSerializer(data=request.data)
+        serializer = ProjectSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             project = serializer.save(user=request.user)
-            return Response(ProjectSerializer(project).data, status=status.HTTP_201_CREATED)
+            return Response(ProjectSerializer(project, context={'request': request}).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -23,8 +30,12 @@ class ProjectListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        projects = Project.objects.filter(user=request.user)
-        serializer = ProjectSerializer(projects, many=True)
+        projects = projects_for(request.user)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(projects, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(ProjectSerializer(page, many=True, context={'request': request}).data)
+        serializer = ProjectSerializer(projects, many=True, context={'request': request})
         return Response(serializer.data)
 
 
@@ -35,16 +46,16 @@ class ProjectDetailView(APIView):
         return get_object_or_404(Project, pk=pk, user=user)
 
     def get(self, request, pk):
-        project = self.get_object(pk, request.user)
-        serializer = ProjectSerializer(project)
+        project = get_object_or_404(projects_for(request.user), pk=pk)
+        serializer = ProjectSerializer(project, context={'request': request})
         return Response(serializer.data)
 
     def put(self, request, pk):
         project = self.get_object(pk, request.user)
-        serializer = ProjectSerializer(project, data=request.data, partial=True)
+        serializer = ProjectSerializer(project, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             updated = serializer.save()
-            return Response(ProjectSerializer(updated).data)
+            return Response(ProjectSerializer(updated, context={'request': request}).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
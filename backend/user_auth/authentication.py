@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from backend import versioning
+
+# How long a resolved user may be reused; saving or deleting the user bumps the
+# version long before that, so this only bounds changes made behind the ORM's back
+AUTH_USER_CACHE_TIMEOUT = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+
+
+def get_version(user_id):
+    return versioning.get_version("auth:user", user_id)
+
+
+def bump_version(user_id):
+    """Drop the cached user, so the next request reads it from the database again."""
+    versioning.bump_version("auth:user", user_id)
+
+
+def _user_key(user_id, version):
+    return f"auth:user:{user_id}:v{version}"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reuses the resolved user for AUTH_USER_CACHE_TIMEOUT
+    seconds instead of selecting it on every request. The key carries a per-user
+    version stamp that user_auth.signals bumps whenever the user is saved (password
+    changes, deactivation) or deleted.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        key = _user_key(user_id, get_version(user_id))
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        # the version stamp already covers these, but a cached user must never be
+        # more permissive than the uncached path
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -1,3 +1,70 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+COUNT_URL = "/api/employees/count/"
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("owner", password="secret-pass")
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def user_lookups(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(COUNT_URL)
+        lookups = [q["sql"] for q in queries if 'FROM "auth_user"' in q["sql"]]
+        return response, len(lookups)
+
+    def test_repeated_requests_skip_the_user_query(self):
+        response, lookups = self.user_lookups()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookups, 1)
+
+        # only the view's own COUNT is left
+        with self.assertNumQueries(1):
+            response = self.client.get(COUNT_URL)
+        self.assertEqual(response.status_code, 200)
+
+    def test_password_change_reloads_the_user(self):
+        self.user_lookups()
+        self.user.set_password("another-pass")
+        self.user.save()
+
+        response, lookups = self.user_lookups()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookups, 1)
+
+    def test_deactivation_rejects_the_cached_user(self):
+        self.user_lookups()
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+
+        response, _ = self.user_lookups()
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.user_lookups()
+        self.user.delete()
+
+        response, _ = self.user_lookups()
+        self.assertEqual(response.status_code, 401)
+
+    def test_users_are_cached_separately(self):
+        other = User.objects.create_user("other", password="secret-pass")
+        self.user_lookups()
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(other).access_token}")
+        with CaptureQueriesContext(connection) as queries:
+            client.get(COUNT_URL)
+            response = client.get(COUNT_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum('FROM "auth_user"' in q["sql"] for q in queries), 1)
@@ -56,8 +56,9 @@ const ProjectModal = ({ onClose, onSubmit, editingProject }) => {
                 name: editingProject.name || "",
                 deadline: editingProject.deadline || "",
                 employee_ids: editingProject.employees?.map((e) => e.id) || [],
+                // keep task ids so the backend updates tasks in place instead of recreating them
                 tasks: editingProject.tasks?.map((t) =>
-                    typeof t === "string" ? { name: t, is_completed: false } : { name: t.name, is_completed: !!t.is_completed }
+                    typeof t === "string" ? { name: t, is_completed: false } : { id: t.id, name: t.name, is_completed: !!t.is_completed }
                 ) || [],
                 github_repo_url: editingProject.github_repo_url || "", // <-- populate when editing
             });
@@ -20,6 +20,11 @@ import { Card } from "../components/ui/Card";
 import Button from "../components/ui/Button";
 import axiosInstance from "../utils/axiosInstance";
 
+// Short polls keep no request (and no web worker) waiting on a generation
+const JOB_POLL_INTERVAL_MS = 2000;
+// past the backend's requeue of stranded jobs plus a render
+const JOB_TIMEOUT_MS = 20 * 60 * 1000;
+
 const Marketing = () => {
   const [loading, setLoading] = useState(false);
   const [prompt, setPrompt] = useState("");
@@ -114,6 +119,18 @@ const Marketing = () => {
     }
   };
 
+  // Generation runs as a background job; poll its status until it finishes
+  const waitForPoster = async (jobId) => {
+    const deadline = Date.now() + JOB_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+      const { data } = await axiosInstance.get(`/api/marketing/jobs/${jobId}/`);
+      if (data.status === "succeeded") return data.poster;
+      if (data.status === "failed") throw new Error(data.error || "Poster generation failed");
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+    throw new Error("Poster generation is taking too long; check back later");
+  };
+
   const handleGenerate = async () => {
     if (!prompt.trim()) return alert("Please enter a prompt.");
     setLoading(true);
@@ -126,8 +143,9 @@ const Marketing = () => {
       formData.append("tone", tone);
 
       const res = await axiosInstance.post("/api/marketing/add/", formData);
-      setResult(res.data);
-      setRecentPosts((prev) => [res.data, ...prev]);
+      const poster = await waitForPoster(res.data.id);
+      setResult(poster);
+      setRecentPosts((prev) => [poster, ...prev]);
     } catch (err) {
       console.error(err);
       alert("Failed to generate poster");
@@ -588,8 +606,9 @@ const Marketing = () => {
                     <Card className="p-4 bg-black border border-gray-700 rounded-lg flex flex-col">
                       <div className="w-full h-[160px] md:h-[200px] overflow-hidden rounded-lg mb-3">
                         <img
-                          src={post.image}
+                          src={post.thumbnail || post.public_url}
                           alt="Recent poster"
+                          loading="lazy"
                           className="w-full h-full object-cover"
                         />
                       </div>
@@ -599,7 +618,7 @@ const Marketing = () => {
                           className="gap-1 flex-1"
                           size="sm"
                           variant="secondary"
-                          onClick={() => handleDownloadImage(post.image)}
+                          onClick={() => handleDownloadImage(post.public_url || post.medium)}
                         >
                           <Download className="w-4 h-4" />
                           Download